@@ -0,0 +1,76 @@
+"""Compare the insert throughput of the logging backends.
+
+Run from the repository root:
+
+    python benchmarks/bench_backends.py [--events 10000] [--batch-size 100]
+
+Events are written to a fresh test database (in memory for SQLite), one
+transaction per batch, and the best of three runs is reported in rows/sec.
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.settings")
+django.setup()
+
+from django.contrib.contenttypes.models import ContentType  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from easyaudit.backends import ModelBackend, RawModelBackend  # noqa: E402
+from easyaudit.models import CRUDEvent  # noqa: E402
+
+
+def crud_infos(count):
+    content_type_id = ContentType.objects.get_for_model(CRUDEvent).id
+    return [
+        {
+            "content_type_id": content_type_id,
+            "datetime": timezone.now(),
+            "event_type": CRUDEvent.UPDATE,
+            "object_id": i,
+            "object_json_repr": f'[{{"model": "app.model", "pk": {i}, "fields": {{}}}}]',
+            "object_repr": f"Object {i}",
+            "user_id": None,
+            "user_pk_as_string": "",
+            "changed_fields": '{"name": ["old", "new"]}',
+        }
+        for i in range(count)
+    ]
+
+
+def run(backend, infos, batch_size):
+    start = time.perf_counter()
+    for i in range(0, len(infos), batch_size):
+        with transaction.atomic():
+            backend.bulk_crud(infos[i : i + batch_size])
+    elapsed = time.perf_counter() - start
+    CRUDEvent.objects.all().delete()
+    return len(infos) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=10000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    connection.creation.create_test_db(verbosity=0)
+    infos = crud_infos(args.events)
+    sys.stdout.write(
+        f"{connection.vendor}, {args.events} CRUD events, batches of {args.batch_size}\n"
+    )
+    for backend in (ModelBackend(), RawModelBackend()):
+        rate = max(run(backend, infos, args.batch_size) for _ in range(3))
+        sys.stdout.write(f"{type(backend).__name__:>16}: {rate:>10,.0f} rows/sec\n")
+
+
+if __name__ == "__main__":
+    main()
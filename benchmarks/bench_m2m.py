@@ -0,0 +1,106 @@
+"""Measure the cost of auditing many-to-many changes.
+
+Run from the repository root:
+
+    python benchmarks/bench_m2m.py [--events 1000]
+
+Each workload changes a many-to-many relation one object at a time, inside a
+transaction, on a fresh test database (in memory for SQLite); the events are
+written when it commits. Every change is audited: `forward` adds tags to an
+article, `reverse` adds articles to a tag, and `reverse_with_m2m` adds collections
+to an article that has tags. The rate of changes and the number of queries per
+change are reported, best of three runs.
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.settings")
+django.setup()
+
+from django.db import connection, transaction  # noqa: E402
+
+from tests.test_app.models import Article, Collection, Tag  # noqa: E402
+
+
+def run(workload, count):
+    """Run `workload` in a transaction; return its changes/sec and queries/change."""
+    changes = workload(count)
+    queries = []
+
+    def count_query(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(count_query):
+        start = time.perf_counter()
+        with transaction.atomic():
+            changes()
+        elapsed = time.perf_counter() - start
+    return count / elapsed, len(queries) / count
+
+
+def forward(count):
+    article = Article.objects.create(title="article")
+    tags = Tag.objects.bulk_create(Tag(name=f"tag {i}") for i in range(count))
+
+    def changes():
+        for tag in tags:
+            article.tags.add(tag)
+
+    return changes
+
+
+def reverse(count):
+    tag = Tag.objects.create(name="tag")
+    articles = Article.objects.bulk_create(
+        Article(title=f"article {i}") for i in range(count)
+    )
+
+    def changes():
+        for article in articles:
+            tag.article_set.add(article)
+
+    return changes
+
+
+def reverse_with_m2m(count):
+    # Each change serializes the article, along with its tags.
+    article = Article.objects.create(title="article")
+    article.tags.add(*Tag.objects.bulk_create(Tag(name=f"tag {i}") for i in range(50)))
+    collections = Collection.objects.bulk_create(
+        Collection(name=f"collection {i}") for i in range(count)
+    )
+
+    def changes():
+        for collection in collections:
+            article.collection_set.add(collection)
+
+    return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=1000)
+    args = parser.parse_args()
+
+    connection.creation.create_test_db(verbosity=0)
+    sys.stdout.write(f"{connection.vendor}, {args.events} changes\n")
+    for workload in (forward, reverse, reverse_with_m2m):
+        results = [run(workload, args.events) for _ in range(3)]
+        rate = max(rate for rate, _ in results)
+        queries = results[0][1]
+        sys.stdout.write(
+            f"{workload.__name__:>17}: {rate:>9,.0f} changes/sec, "
+            f"{queries:.1f} queries/change\n"
+        )
+
+
+if __name__ == "__main__":
+    main()
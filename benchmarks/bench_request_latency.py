@@ -0,0 +1,100 @@
+"""Compare the time to first byte of requests with request logging off and on.
+
+Run from the repository root:
+
+    python benchmarks/bench_request_latency.py [--requests 2000]
+
+Requests for a plain view are served by Django's WSGI handler, and the time from
+calling the handler to the start of the response is measured. Request events are
+written to a fresh test database (in memory for SQLite), before the view runs or,
+when deferred, after the response. The best of three runs is reported.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from wsgiref.util import setup_testing_defaults
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.settings")
+django.setup()
+
+from django.core.handlers.wsgi import WSGIHandler  # noqa: E402
+from django.core.signals import request_started  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import override_settings  # noqa: E402
+
+from easyaudit.models import RequestEvent  # noqa: E402
+from easyaudit.signals import request_signals  # noqa: E402
+
+
+def run(handler, count):
+    """Serve `count` requests and return their times to first byte, in seconds."""
+    timings = []
+    for _ in range(count):
+        environ = {
+            "PATH_INFO": "/test_app/index",
+            "QUERY_STRING": "",
+            "REMOTE_ADDR": "127.0.0.1",
+        }
+        setup_testing_defaults(environ)
+        first_byte = []
+
+        def start_response(status, headers, exc_info=None, first_byte=first_byte):
+            first_byte.append(time.perf_counter())
+
+        start = time.perf_counter()
+        response = handler(environ, start_response)
+        timings.append(first_byte[0] - start)
+        for _chunk in response:
+            pass
+        # Sends `request_finished`, as WSGI servers do once the response is sent.
+        response.close()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    connection.creation.create_test_db(verbosity=0)
+    handler = WSGIHandler()
+
+    def logging_off():
+        request_started.disconnect(dispatch_uid="easy_audit_signals_request_started")
+
+    def logging_on():
+        request_started.connect(
+            request_signals.request_started_handler,
+            dispatch_uid="easy_audit_signals_request_started",
+        )
+        request_signals.DEFER_REQUEST_EVENTS = False
+
+    def logging_deferred():
+        logging_on()
+        request_signals.DEFER_REQUEST_EVENTS = True
+
+    modes = {"off": logging_off, "on": logging_on, "deferred": logging_deferred}
+    sys.stdout.write(f"{connection.vendor}, {args.requests} requests\n")
+    with override_settings(ALLOWED_HOSTS=["*"]):
+        for name, setup in modes.items():
+            setup()
+            runs = [run(handler, args.requests) for _ in range(3)]
+            request_signals.deferred_request_events.flush()
+            timings = min(runs, key=statistics.mean)
+            p99 = statistics.quantiles(timings, n=100)[98]
+            sys.stdout.write(
+                f"{name:>10}: mean {statistics.mean(timings) * 1e6:>7,.0f} us, "
+                f"p99 {p99 * 1e6:>7,.0f} us\n"
+            )
+    sys.stdout.write(f"{RequestEvent.objects.count()} request events written\n")
+
+
+if __name__ == "__main__":
+    main()
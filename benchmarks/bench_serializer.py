@@ -0,0 +1,59 @@
+"""Compare the compiled model serializer with Django's JSON serializer.
+
+Run from the repository root:
+
+    python benchmarks/bench_serializer.py [--events 20000]
+
+Each run serializes the same unsaved instances one at a time, as the signal
+handlers do for every event; the best of three runs is reported.
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.settings")
+django.setup()
+
+from django.core import serializers  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from easyaudit.utils import serialize_instance  # noqa: E402
+from tests.test_app.models import ForeignKeyModel, Model  # noqa: E402
+
+
+def run(serialize, instances):
+    start = time.perf_counter()
+    for instance in instances:
+        serialize(instance)
+    return len(instances) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=20000)
+    args = parser.parse_args()
+
+    parent = Model(id=1, name="parent")
+    instances = [
+        ForeignKeyModel(id=i, name=f"name {i} {timezone.now()}", test_fk=parent)
+        for i in range(args.events)
+    ]
+
+    serializers_ = {
+        "django": lambda instance: serializers.serialize("json", [instance]),
+        "compiled": serialize_instance,
+    }
+    sys.stdout.write(f"{args.events} events\n")
+    for name, serialize in serializers_.items():
+        rate = max(run(serialize, instances) for _ in range(3))
+        sys.stdout.write(f"{name:>10}: {rate:>12,.0f} events/sec\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Compare the URL filter of the request signals with per-request pattern compiling.
+
+Run from the repository root:
+
+    python benchmarks/bench_url_filter.py [--patterns 60] [--requests 100000]
+
+Each run filters the same mix of request paths, some of them excluded, through
+`--patterns` exclusion patterns; the best of three runs is reported.
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+import django
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.settings")
+django.setup()
+
+from easyaudit.signals.request_signals import URLFilter  # noqa: E402
+
+
+def compile_per_request(unregistered_urls):
+    """Filter URLs the way `should_log_url` did before `URLFilter`."""
+
+    def should_log_url(url):
+        for unregistered_url in unregistered_urls:
+            pattern = re.compile(unregistered_url)
+            if pattern.match(url):
+                return False
+        return True
+
+    return should_log_url
+
+
+def run(should_log_url, paths):
+    start = time.perf_counter()
+    for path in paths:
+        should_log_url(path)
+    return len(paths) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--patterns", type=int, default=60)
+    parser.add_argument("--requests", type=int, default=100000)
+    args = parser.parse_args()
+
+    patterns = [rf"^/excluded-{i}/" for i in range(args.patterns)]
+    # 1000 distinct paths: 1 in 10 excluded, by the last pattern at worst.
+    distinct_paths = [
+        f"/excluded-{i % args.patterns}/{i}" if i % 10 == 0 else f"/api/items/{i}"
+        for i in range(1000)
+    ]
+    paths = [distinct_paths[i % len(distinct_paths)] for i in range(args.requests)]
+
+    filters = {
+        "compile per request": compile_per_request(patterns),
+        "URLFilter, uncached": URLFilter(patterns, [], cache_size=0).should_log,
+        "URLFilter": URLFilter(patterns, [], cache_size=1024).should_log,
+    }
+    sys.stdout.write(f"{args.patterns} patterns, {args.requests} requests\n")
+    for name, should_log_url in filters.items():
+        rate = max(run(should_log_url, paths) for _ in range(3))
+        sys.stdout.write(f"{name:>20}: {rate:>12,.0f} requests/sec\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,7 @@ from django.utils.html import escape
 from django.utils.safestring import mark_safe
 
 from .admin_helpers import EasyAuditModelAdmin, prettify_json
+from .backends import snapshot_store
 from .models import CRUDEvent, LoginEvent, RequestEvent
 from .settings import (
     ADMIN_SHOW_AUTH_EVENTS,
@@ -30,10 +31,14 @@ def export_to_csv(modeladmin, request, queryset):
     response = HttpResponse(content_type="text/csv")
     response["Content-Disposition"] = f"attachment;filename={opts.verbose_name}.csv"
     writer = csv.writer(response)
+    # Compressed fields are exported decompressed, under the name of their text field.
+    compressed_fields = getattr(modeladmin.model, "COMPRESSED_FIELDS", {})
     fields = [
         field
         for field in opts.get_fields()
-        if not field.many_to_many and not field.one_to_many
+        if not field.many_to_many
+        and not field.one_to_many
+        and field.name not in compressed_fields.values()
     ]
     # Write a first row with header information
     writer.writerow([field.verbose_name for field in fields])
@@ -41,7 +46,10 @@ def export_to_csv(modeladmin, request, queryset):
     for obj in queryset:
         data_row = []
         for field in fields:
-            value = getattr(obj, field.name)
+            if field.name in compressed_fields:
+                value = getattr(obj, f"get_{field.name}")()
+            else:
+                value = getattr(obj, field.name)
             if isinstance(value, datetime.datetime):
                 value = value.strftime("%d/%m/%Y")
             data_row.append(value)
@@ -74,7 +82,14 @@ class CRUDEventAdmin(EasyAuditModelAdmin):
         "datetime",
         "changed_fields_prettified",
     ]
-    exclude = ["object_json_repr", "changed_fields"]
+    exclude = [
+        "object_json_repr",
+        "changed_fields",
+        "object_json_repr_compressed",
+        "changed_fields_compressed",
+        "object_json_repr_hash",
+        "is_snapshot",
+    ]
 
     def get_changelist_instance(self, *args, **kwargs):
         changelist_instance = super().get_changelist_instance(*args, **kwargs)
@@ -86,7 +101,11 @@ class CRUDEventAdmin(EasyAuditModelAdmin):
 
     @admin.display(description="Content Type")
     def get_content_type(self, obj):
-        return self.content_types_by_id[obj.content_type_id]
+        # Looked up in bulk for the change list only.
+        content_types_by_id = getattr(self, "content_types_by_id", {})
+        if obj.content_type_id in content_types_by_id:
+            return content_types_by_id[obj.content_type_id]
+        return ContentType.objects.get_for_id(obj.content_type_id)
 
     @admin.display(description="User")
     def get_user(self, obj):
@@ -111,11 +130,14 @@ class CRUDEventAdmin(EasyAuditModelAdmin):
 
     @admin.display(description="object json repr")
     def object_json_repr_prettified(self, obj):
-        return prettify_json(obj.object_json_repr)
+        return prettify_json(obj.get_full_object_json_repr())
 
     @admin.display(description="changed fields")
     def changed_fields_prettified(self, obj):
-        return prettify_json(obj.changed_fields)
+        return prettify_json(obj.get_changed_fields())
+
+    def purge_related_objects(self):
+        snapshot_store.delete_orphans()
 
     actions = [export_to_csv]
 
@@ -167,6 +189,7 @@ class RequestEventAdmin(EasyAuditModelAdmin):
         "get_user",
         "remote_ip",
         "datetime",
+        "sample_rate",
     ]
 
     @admin.display(description="User")
@@ -34,9 +34,16 @@ class EasyAuditModelAdmin(admin.ModelAdmin):
         return changelist_instance
 
     def get_readonly_fields(self, request, obj=None):
-        """Mark all fields of model as readonly if configured to do so."""
+        """Mark all fields of model as readonly if configured to do so.
+
+        The excluded fields stay hidden.
+        """
         if READONLY_EVENTS:
-            return [f.name for f in self.model._meta.get_fields()]
+            readonly_fields = list(self.readonly_fields)
+            hidden = set(self.get_exclude(request, obj) or ()) | set(readonly_fields)
+            return readonly_fields + [
+                f.name for f in self.model._meta.get_fields() if f.name not in hidden
+            ]
         return self.readonly_fields
 
     @admin.display(description="User")
@@ -79,6 +86,9 @@ class EasyAuditModelAdmin(admin.ModelAdmin):
     def purge(self, request):
         return self.purge_objects(request)
 
+    def purge_related_objects(self):
+        """Delete the objects that only the purged rows referred to."""
+
     # Helper view to remove all rows in a table
     def purge_objects(self, request):
         """Remove all objects in this table.
@@ -115,6 +125,7 @@ class EasyAuditModelAdmin(admin.ModelAdmin):
                 try:
                     n = modeladmin.model.objects.count()
                     truncate_table(modeladmin.model)
+                    modeladmin.purge_related_objects()
                     modeladmin.message_user(
                         request,
                         _(f"Successfully removed {n} rows"),
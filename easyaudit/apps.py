@@ -7,8 +7,12 @@ class EasyAuditConfig(AppConfig):
     default_auto_field = "django.db.models.AutoField"
 
     def ready(self):
+        from easyaudit.settings import WATCH_MODEL_EVENTS
         from easyaudit.signals import (  # noqa: F401
             auth_signals,
             model_signals,
             request_signals,
         )
+
+        if WATCH_MODEL_EVENTS:
+            model_signals.connect_model_signals()
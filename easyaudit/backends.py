@@ -1,16 +1,956 @@
+import atexit
+import contextlib
+import errno
+import functools
+import hashlib
+import itertools
 import logging
+import os
+import queue
+import socket
+import threading
+import time
+import weakref
+from collections import OrderedDict
 
-from easyaudit.models import CRUDEvent, LoginEvent, RequestEvent
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import request_finished
+from django.db import close_old_connections, connections, router, transaction
+from django.utils.module_loading import import_string
+
+from easyaudit.models import CRUDEvent, LoginEvent, RequestEvent, Snapshot
+from easyaudit.settings import (
+    BUFFER_FLUSH_INTERVAL,
+    BUFFER_SIZE,
+    COLLECTOR_SOCKET,
+    COMPOSITE_BACKENDS,
+    COMPRESS_JSON,
+    COMPRESS_MIN_SIZE,
+    DEDUPLICATE_SNAPSHOTS,
+    QUEUE_FULL_POLICY,
+    QUEUE_SIZE,
+    QUEUE_SPILL_DIR,
+    SNAPSHOT_CACHE_SIZE,
+    SPOOL_DIR,
+    SPOOL_SEGMENT_AGE,
+    SPOOL_SEGMENT_SIZE,
+)
+from easyaudit.spool import SegmentWriter
+from easyaudit.utils import (
+    compress_event_fields,
+    dump_event,
+    load_event,
+    should_propagate_exceptions,
+)
 
 logger = logging.getLogger(__name__)
 
+_STOP = object()
+_writer_ids = itertools.count(1)
+
+
+class SnapshotStore:
+    """Store object JSON representations once, in the `Snapshot` table.
+
+    Snapshots are keyed by the SHA-256 hash of their text and inserted with
+    `ignore_conflicts`, so storing an existing one is harmless. The hashes of the
+    `cache_size` latest snapshots committed by the process are remembered, and
+    their snapshots not inserted again.
+    """
+
+    def __init__(self, cache_size=None):
+        self.cache_size = SNAPSHOT_CACHE_SIZE if cache_size is None else cache_size
+        self._hashes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _is_known(self, digest):
+        with self._lock:
+            if digest in self._hashes:
+                self._hashes.move_to_end(digest)
+                return True
+            return False
+
+    def _remember(self, digests):
+        with self._lock:
+            for digest in digests:
+                self._hashes[digest] = None
+                self._hashes.move_to_end(digest)
+            while len(self._hashes) > self.cache_size:
+                self._hashes.popitem(last=False)
+
+    def store(self, crud_infos):
+        """Store the object JSON representations of CRUD events as snapshots.
+
+        :return: Copies of the event dicts, referring to their snapshot by hash.
+        :rtype: list
+        """
+        snapshots = {}
+        stored_infos = []
+        for crud_info in crud_infos:
+            text = crud_info.get("object_json_repr")
+            if not text:
+                stored_infos.append(crud_info)
+                continue
+
+            digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+            stored_infos.append(
+                {**crud_info, "object_json_repr": "", "object_json_repr_hash": digest}
+            )
+            if not self._is_known(digest):
+                snapshots[digest] = text
+
+        if snapshots:
+            Snapshot.objects.bulk_create(
+                [Snapshot(hash=digest, data=text) for digest, text in snapshots.items()],
+                ignore_conflicts=True,
+            )
+            # Unless remembered only once committed, a rolled back snapshot could
+            # be referred to by later events.
+            transaction.on_commit(
+                functools.partial(self._remember, list(snapshots)),
+                using=router.db_for_write(Snapshot),
+            )
+        return stored_infos
+
+    def delete_orphans(self, using=None):
+        """Delete the snapshots that no CRUD event refers to any longer.
+
+        The hashes remembered by the process are forgotten, as their snapshots may
+        be deleted.
+
+        :return: The number of snapshots deleted.
+        :rtype: int
+        """
+        using = using or router.db_for_write(Snapshot)
+        referenced = (
+            CRUDEvent.objects.using(using)
+            .exclude(object_json_repr_hash="")
+            .values("object_json_repr_hash")
+        )
+        with self._lock:
+            self._hashes.clear()
+        deleted, _ = Snapshot.objects.using(using).exclude(hash__in=referenced).delete()
+        return deleted
+
+
+snapshot_store = SnapshotStore()
+
+
+def prepare_crud_infos(crud_infos):
+    """Get CRUD events ready to be written to the `CRUDEvent` table.
+
+    Their JSON is stored as snapshots if `DJANGO_EASY_AUDIT_DEDUPLICATE_SNAPSHOTS` is
+    set, and compressed if `DJANGO_EASY_AUDIT_COMPRESS_JSON` is.
+    """
+    if DEDUPLICATE_SNAPSHOTS:
+        crud_infos = snapshot_store.store(crud_infos)
+    if COMPRESS_JSON:
+        crud_infos = [
+            compress_event_fields(crud_info, CRUDEvent.COMPRESSED_FIELDS, COMPRESS_MIN_SIZE)
+            for crud_info in crud_infos
+        ]
+    return crud_infos
+
 
 class ModelBackend:
     def request(self, request_info):
         return RequestEvent.objects.create(**request_info)
 
     def crud(self, crud_info):
+        (crud_info,) = prepare_crud_infos([crud_info])
         return CRUDEvent.objects.create(**crud_info)
 
     def login(self, login_info):
         return LoginEvent.objects.create(**login_info)
+
+    def bulk_request(self, request_infos):
+        return RequestEvent.objects.bulk_create(
+            [RequestEvent(**request_info) for request_info in request_infos]
+        )
+
+    def bulk_crud(self, crud_infos):
+        return CRUDEvent.objects.bulk_create(
+            [CRUDEvent(**crud_info) for crud_info in prepare_crud_infos(crud_infos)]
+        )
+
+    def bulk_login(self, login_infos):
+        return LoginEvent.objects.bulk_create(
+            [LoginEvent(**login_info) for login_info in login_infos]
+        )
+
+    async def arequest(self, request_info):
+        return await RequestEvent.objects.acreate(**request_info)
+
+
+def _to_str(value):
+    return value if value is None or isinstance(value, str) else str(value)
+
+
+class RawModelBackend(ModelBackend):
+    """Insert events with `cursor.executemany()`, without building model instances.
+
+    The columns of each event table, and how to convert an event value into a query
+    parameter, are worked out once per model and database. Events must use the
+    attribute names of the fields, such as `user_id`; missing fields get their
+    default value. Unlike `bulk_create()`, no model signals are sent.
+    """
+
+    # Values these fields already hold are valid query parameters.
+    PASSTHROUGH_FIELDS = {
+        "BigIntegerField",
+        "BooleanField",
+        "IntegerField",
+        "PositiveIntegerField",
+        "PositiveSmallIntegerField",
+        "SmallIntegerField",
+    }
+
+    def __init__(self):
+        self._plans = {}
+
+    def _plan(self, model, using):
+        plan = self._plans.get((model, using))
+        if plan is None:
+            connection = connections[using]
+            quote_name = connection.ops.quote_name
+            opts = model._meta
+            fields = [f for f in opts.concrete_fields if f is not opts.auto_field]
+            # Only quoted table and column names are interpolated.
+            sql = "INSERT INTO {} ({}) VALUES ({})".format(  # noqa: S608
+                quote_name(opts.db_table),
+                ", ".join(quote_name(f.column) for f in fields),
+                ", ".join(["%s"] * len(fields)),
+            )
+            columns = []
+            for field in fields:
+                internal_type = field.get_internal_type()
+                if internal_type in self.PASSTHROUGH_FIELDS:
+                    convert = None
+                elif internal_type in {"CharField", "TextField"}:
+                    convert = _to_str
+                else:
+                    convert = functools.partial(
+                        field.get_db_prep_save, connection=connection
+                    )
+                columns.append((field.attname, field.get_default, convert))
+            plan = self._plans[model, using] = (sql, columns)
+        return plan
+
+    def insert(self, model, infos):
+        """Insert one row into the table of `model` for each event dict."""
+        using = router.db_for_write(model)
+        sql, columns = self._plan(model, using)
+        params = []
+        for info in infos:
+            row = []
+            for attname, get_default, convert in columns:
+                value = info[attname] if attname in info else get_default()
+                row.append(value if convert is None else convert(value))
+            params.append(row)
+        with connections[using].cursor() as cursor:
+            cursor.executemany(sql, params)
+
+    def request(self, request_info):
+        self.insert(RequestEvent, [request_info])
+        return request_info
+
+    def crud(self, crud_info):
+        self.insert(CRUDEvent, prepare_crud_infos([crud_info]))
+        return crud_info
+
+    def login(self, login_info):
+        self.insert(LoginEvent, [login_info])
+        return login_info
+
+    def bulk_request(self, request_infos):
+        self.insert(RequestEvent, request_infos)
+
+    def bulk_crud(self, crud_infos):
+        self.insert(CRUDEvent, prepare_crud_infos(crud_infos))
+
+    def bulk_login(self, login_infos):
+        self.insert(LoginEvent, login_infos)
+
+    async def arequest(self, request_info):
+        return await sync_to_async(self.request)(request_info)
+
+
+# The objects of the process holding events that are not written yet. Each of them is
+# closed, writing its events, when the process exits. They are held weakly, so that
+# building one (in a test, or in a `CompositeBackend`) does not keep it alive.
+_open_writers = weakref.WeakSet()
+
+
+def _close_open_writers():
+    for writer in list(_open_writers):
+        writer.close()
+
+
+atexit.register(_close_open_writers)
+
+
+def _flush_event_buffers(sender, **kwargs):
+    for writer in list(_open_writers):
+        if isinstance(writer, EventBuffer) and writer.flush_after_requests:
+            writer.flush()
+
+
+request_finished.connect(_flush_event_buffers, dispatch_uid="easy_audit_event_buffers")
+
+
+class EventBuffer:
+    """Keep events in memory, by kind, and write them in batches.
+
+    `writers` maps each kind of event to a function writing a list of events of
+    that kind. The buffer is due for a flush once it holds `batch_size` events, or
+    when it holds any `flush_interval` seconds after the previous flush. It is
+    flushed at the end of every request if `flush_after_requests` is set, and when
+    the process exits or it is closed.
+    """
+
+    def __init__(self, writers, batch_size, flush_interval, flush_after_requests=True):
+        self.writers = writers
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.flush_after_requests = flush_after_requests
+        self._lock = threading.Lock()
+        self._buffers = {kind: [] for kind in writers}
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        _open_writers.add(self)
+
+    def _is_due(self):
+        return self._pending >= self.batch_size or (
+            self._pending > 0 and time.monotonic() - self._last_flush >= self.flush_interval
+        )
+
+    def add(self, kind, info):
+        """Buffer an event and tell whether the buffer is due for a flush."""
+        with self._lock:
+            self._buffers[kind].append(info)
+            self._pending += 1
+            return self._is_due()
+
+    def flush_if_due(self):
+        with self._lock:
+            due = self._is_due()
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Write every pending event, one batch per kind of event."""
+        with self._lock:
+            buffers = self._buffers
+            self._buffers = {kind: [] for kind in self.writers}
+            self._pending = 0
+            self._last_flush = time.monotonic()
+
+        for kind, infos in buffers.items():
+            if not infos:
+                continue
+            try:
+                self.writers[kind](infos)
+            except Exception:
+                logger.exception(
+                    f"easy audit could not flush {len(infos)} buffered {kind} events."
+                )
+                if should_propagate_exceptions():
+                    raise
+
+    def close(self):
+        """Write every pending event, and stop flushing the buffer with the process."""
+        _open_writers.discard(self)
+        self.flush()
+
+
+class BufferedModelBackend(ModelBackend):
+    """Collect events in memory and write them with a single `bulk_create` per table.
+
+    Pending events are flushed when `batch_size` of them have been collected, when
+    an event is logged more than `flush_interval` seconds after the previous flush,
+    at the end of every request and when the process exits.
+    """
+
+    def __init__(self, batch_size=None, flush_interval=None):
+        self.buffer = EventBuffer(
+            {
+                "request": super().bulk_request,
+                "crud": super().bulk_crud,
+                "login": super().bulk_login,
+            },
+            BUFFER_SIZE if batch_size is None else batch_size,
+            BUFFER_FLUSH_INTERVAL if flush_interval is None else flush_interval,
+        )
+
+    def request(self, request_info):
+        self._append("request", request_info)
+        return request_info
+
+    def crud(self, crud_info):
+        self._append("crud", crud_info)
+        return crud_info
+
+    def login(self, login_info):
+        self._append("login", login_info)
+        return login_info
+
+    async def arequest(self, request_info):
+        await self._aappend("request", request_info)
+        return request_info
+
+    def _append(self, kind, info):
+        if self.buffer.add(kind, info):
+            self.flush()
+
+    async def _aappend(self, kind, info):
+        if self.buffer.add(kind, info):
+            await sync_to_async(self.flush)()
+
+    def flush(self):
+        """Write every pending event, one bulk insert per event table."""
+        self.buffer.flush()
+
+    def close(self):
+        """Write every pending event, and stop flushing them with requests."""
+        self.buffer.close()
+
+    def bulk_request(self, request_infos):
+        for request_info in request_infos:
+            self.request(request_info)
+
+    def bulk_crud(self, crud_infos):
+        for crud_info in crud_infos:
+            self.crud(crud_info)
+
+    def bulk_login(self, login_infos):
+        for login_info in login_infos:
+            self.login(login_info)
+
+
+class QueuedWriter:
+    """Write events from a bounded queue in a dedicated writer thread.
+
+    Events are written in batches of up to `batch_size` events with the `bulk_*`
+    methods of `backend`, on the writer thread's own database connection. The
+    `full_policy` decides what happens to an event logged while the queue is full:
+
+    - "block": wait until the writer thread has made room for it;
+    - "drop_oldest": discard the oldest queued event to make room for it;
+    - "drop_newest": discard the event being logged;
+    - "spill": append it to a JSON lines file in `spill_dir`. Spilled events, and
+      batches the backend failed to write, are written once the queue is idle.
+
+    The writer thread is started by the first event logged in a process. Queued
+    events are written when the process exits; events logged afterwards are
+    written in the caller's thread.
+    """
+
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    DROP_NEWEST = "drop_newest"
+    SPILL = "spill"
+    FULL_POLICIES = (BLOCK, DROP_OLDEST, DROP_NEWEST, SPILL)
+
+    def __init__(  # noqa: PLR0913
+        self,
+        backend,
+        *,
+        maxsize=None,
+        full_policy=None,
+        spill_dir=None,
+        batch_size=None,
+        poll_interval=None,
+        name=None,
+    ):
+        self.backend = backend
+        self.maxsize = QUEUE_SIZE if maxsize is None else maxsize
+        self.full_policy = full_policy or QUEUE_FULL_POLICY
+        self.spill_dir = spill_dir or QUEUE_SPILL_DIR
+        self.batch_size = batch_size or BUFFER_SIZE
+        self.poll_interval = (
+            BUFFER_FLUSH_INTERVAL if poll_interval is None else poll_interval
+        )
+        self.name = name or f"easyaudit-writer-{next(_writer_ids)}"
+
+        if self.full_policy not in self.FULL_POLICIES:
+            raise ImproperlyConfigured(
+                f"Unknown queue full policy {self.full_policy!r}, expected one of "
+                f"{', '.join(self.FULL_POLICIES)}."
+            )
+        if self.full_policy == self.SPILL and not self.spill_dir:
+            raise ImproperlyConfigured(
+                "The spill queue full policy requires DJANGO_EASY_AUDIT_QUEUE_SPILL_DIR."
+            )
+
+        self.dropped = 0
+        self.queue = None
+        self._pid = None
+        self._thread = None
+        self._stopped = False
+        self._lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+        _open_writers.add(self)
+
+    @property
+    def spill_path(self):
+        return os.path.join(self.spill_dir, f"{self.name}-{os.getpid()}.jsonl")
+
+    def _ensure_started(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            # Either the first event of the process, or the first one of a child
+            # forked after the parent started its writer: the events queued in the
+            # parent are the parent's to write.
+            self.queue = queue.Queue(self.maxsize)
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def put(self, kind, info):
+        if self._stopped:
+            self.write([(kind, info)])
+            return
+
+        self._ensure_started()
+        item = (kind, info)
+        if self.full_policy == self.BLOCK:
+            self.queue.put(item)
+            return
+
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            self._overflow(item)
+
+    async def aput(self, kind, info):
+        """Like `put()`, but waits for the writer without blocking the event loop."""
+        if self._stopped:
+            await sync_to_async(self.write)([(kind, info)])
+            return
+
+        self._ensure_started()
+        item = (kind, info)
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            if self.full_policy == self.BLOCK:
+                await sync_to_async(self.queue.put, thread_sensitive=False)(item)
+            else:
+                self._overflow(item)
+
+    def _overflow(self, item):
+        if self.full_policy == self.SPILL:
+            self.spill([item])
+            return
+
+        with self._lock:
+            self.dropped += 1
+        if self.full_policy == self.DROP_OLDEST:
+            with contextlib.suppress(queue.Empty):
+                self.queue.get_nowait()
+                self.queue.task_done()
+            # Another thread may have taken the free slot: drop this event then.
+            with contextlib.suppress(queue.Full):
+                self.queue.put_nowait(item)
+
+    def _run(self):
+        while True:
+            try:
+                items = [self.queue.get(timeout=self.poll_interval)]
+            except queue.Empty:
+                self._replay_spill()
+                continue
+
+            while len(items) < self.batch_size:
+                try:
+                    items.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            events = [item for item in items if item is not _STOP]
+            try:
+                close_old_connections()
+                self.write(events)
+            finally:
+                for _ in items:
+                    self.queue.task_done()
+
+            if len(events) != len(items):
+                self._replay_spill()
+                break
+
+        connections.close_all()
+
+    def write(self, items):
+        """Write `items`, a list of `(kind, info)` tuples, one bulk insert per kind."""
+        infos_by_kind = {}
+        for kind, info in items:
+            infos_by_kind.setdefault(kind, []).append(info)
+
+        for kind, infos in infos_by_kind.items():
+            try:
+                bulk = getattr(self.backend, f"bulk_{kind}", None)
+                if bulk is not None:
+                    bulk(infos)
+                else:
+                    for info in infos:
+                        getattr(self.backend, kind)(info)
+            except Exception:
+                logger.exception(
+                    f"easy audit could not write {len(infos)} queued {kind} events."
+                )
+                if self.full_policy == self.SPILL:
+                    self.spill([(kind, info) for info in infos])
+                else:
+                    with self._lock:
+                        self.dropped += len(infos)
+
+    def spill(self, items):
+        with self._spill_lock, open(self.spill_path, "a", encoding="utf-8") as f:
+            f.writelines(f"{dump_event(kind, info)}\n" for kind, info in items)
+
+    def _replay_spill(self):
+        if self.full_policy != self.SPILL:
+            return
+
+        replay_path = f"{self.spill_path}.replay"
+        with self._spill_lock:
+            if not os.path.exists(replay_path):
+                if not os.path.exists(self.spill_path):
+                    return
+                os.replace(self.spill_path, replay_path)
+
+        with open(replay_path, encoding="utf-8") as f:
+            items = [load_event(line) for line in f if line.strip()]
+        for start in range(0, len(items), self.batch_size):
+            # Batches that cannot be written are spilled again.
+            self.write(items[start : start + self.batch_size])
+        os.remove(replay_path)
+
+    def flush(self):
+        """Wait until every queued event has been written."""
+        if self._pid == os.getpid():
+            self.queue.join()
+
+    def stop(self, timeout=10):
+        """Write the queued events and stop the writer thread."""
+        if self._stopped:
+            return
+        self._stopped = True
+        if self._pid != os.getpid() or not self._thread.is_alive():
+            return
+        with contextlib.suppress(queue.Full):
+            self.queue.put(_STOP, timeout=timeout)
+        self._thread.join(timeout)
+
+    def close(self):
+        """Stop the writer, and stop stopping it with the process."""
+        _open_writers.discard(self)
+        self.stop()
+
+
+class QueuedModelBackend(ModelBackend):
+    """Hand events over to a `QueuedWriter` instead of writing them in the caller.
+
+    The database latency of audit writes is then kept out of the request thread.
+    The queue is configured with `DJANGO_EASY_AUDIT_QUEUE_SIZE`,
+    `DJANGO_EASY_AUDIT_QUEUE_FULL_POLICY` and `DJANGO_EASY_AUDIT_QUEUE_SPILL_DIR`;
+    batches hold up to `DJANGO_EASY_AUDIT_BUFFER_SIZE` events.
+    """
+
+    def __init__(self, **writer_kwargs):
+        self.writer = QueuedWriter(ModelBackend(), **writer_kwargs)
+
+    def request(self, request_info):
+        self.writer.put("request", request_info)
+        return request_info
+
+    def crud(self, crud_info):
+        self.writer.put("crud", crud_info)
+        return crud_info
+
+    def login(self, login_info):
+        self.writer.put("login", login_info)
+        return login_info
+
+    def bulk_request(self, request_infos):
+        for request_info in request_infos:
+            self.request(request_info)
+
+    def bulk_crud(self, crud_infos):
+        for crud_info in crud_infos:
+            self.crud(crud_info)
+
+    def bulk_login(self, login_infos):
+        for login_info in login_infos:
+            self.login(login_info)
+
+    async def arequest(self, request_info):
+        await self.writer.aput("request", request_info)
+        return request_info
+
+    def flush(self):
+        self.writer.flush()
+
+    def close(self):
+        self.writer.close()
+
+
+class LoggerBackend:
+    """Emit every event as a line of JSON on the `easyaudit.events` logger.
+
+    Route the logger to a file or stream with Django's `LOGGING` setting.
+    """
+
+    logger = logging.getLogger("easyaudit.events")
+
+    def _log(self, kind, info):
+        self.logger.info(dump_event(kind, info), extra={"event_kind": kind})
+
+    def request(self, request_info):
+        self._log("request", request_info)
+        return request_info
+
+    def crud(self, crud_info):
+        self._log("crud", crud_info)
+        return crud_info
+
+    def login(self, login_info):
+        self._log("login", login_info)
+        return login_info
+
+
+class CompositeBackend:
+    """Dispatch every event to several backends.
+
+    Each backend gets its own `QueuedWriter`, so it writes events in batches on its
+    own thread and neither a slow nor a failing backend holds up the others or the
+    caller. Backends are configured with `DJANGO_EASY_AUDIT_COMPOSITE_BACKENDS`;
+    unless their options say otherwise, events logged while a backend's queue is
+    full are dropped for that backend.
+    """
+
+    def __init__(self, backends=None):
+        backends = COMPOSITE_BACKENDS if backends is None else backends
+        if not backends:
+            raise ImproperlyConfigured(
+                "CompositeBackend requires DJANGO_EASY_AUDIT_COMPOSITE_BACKENDS."
+            )
+
+        self.writers = []
+        for index, entry in enumerate(backends):
+            config = {"BACKEND": entry} if isinstance(entry, str) else entry
+            options = {
+                "full_policy": QueuedWriter.DROP_NEWEST,
+                # A stable name, so that spilled events are replayed after a restart.
+                "name": f"easyaudit-sink-{index}",
+                **config.get("OPTIONS", {}),
+            }
+            backend = import_string(config["BACKEND"])()
+            self.writers.append(QueuedWriter(backend, **options))
+
+    def _put(self, kind, info):
+        for writer in self.writers:
+            # Each backend gets its own copy, in case it alters the event.
+            writer.put(kind, dict(info))
+
+    async def _aput(self, kind, info):
+        for writer in self.writers:
+            await writer.aput(kind, dict(info))
+
+    def request(self, request_info):
+        self._put("request", request_info)
+        return request_info
+
+    def crud(self, crud_info):
+        self._put("crud", crud_info)
+        return crud_info
+
+    def login(self, login_info):
+        self._put("login", login_info)
+        return login_info
+
+    def bulk_request(self, request_infos):
+        for request_info in request_infos:
+            self.request(request_info)
+
+    def bulk_crud(self, crud_infos):
+        for crud_info in crud_infos:
+            self.crud(crud_info)
+
+    def bulk_login(self, login_infos):
+        for login_info in login_infos:
+            self.login(login_info)
+
+    async def arequest(self, request_info):
+        await self._aput("request", request_info)
+        return request_info
+
+    def flush(self):
+        for writer in self.writers:
+            writer.flush()
+
+    def close(self):
+        for writer in self.writers:
+            writer.close()
+            # The backend may hold the events its writer handed over.
+            if hasattr(writer.backend, "close"):
+                writer.backend.close()
+
+
+class SpoolBackend:
+    """Append events to local spool segment files instead of the database.
+
+    Segments are written to `DJANGO_EASY_AUDIT_SPOOL_DIR` and sealed once they reach
+    `DJANGO_EASY_AUDIT_SPOOL_SEGMENT_SIZE` bytes or `DJANGO_EASY_AUDIT_SPOOL_SEGMENT_AGE`
+    seconds, and when the process exits. The `easyaudit_ingest` management command
+    loads sealed segments into the database.
+    """
+
+    def __init__(self, spool_dir=None, segment_size=None, segment_age=None):
+        spool_dir = spool_dir or SPOOL_DIR
+        if not spool_dir:
+            raise ImproperlyConfigured("SpoolBackend requires DJANGO_EASY_AUDIT_SPOOL_DIR.")
+        self.writer = SegmentWriter(
+            spool_dir,
+            max_size=segment_size or SPOOL_SEGMENT_SIZE,
+            max_age=SPOOL_SEGMENT_AGE if segment_age is None else segment_age,
+        )
+        _open_writers.add(self)
+
+    def close(self):
+        """Seal the current segment, and stop sealing it with the process."""
+        _open_writers.discard(self)
+        self.writer.seal()
+
+    def request(self, request_info):
+        self.writer.append("request", request_info)
+        return request_info
+
+    def crud(self, crud_info):
+        self.writer.append("crud", crud_info)
+        return crud_info
+
+    def login(self, login_info):
+        self.writer.append("login", login_info)
+        return login_info
+
+    def bulk_request(self, request_infos):
+        for request_info in request_infos:
+            self.request(request_info)
+
+    def bulk_crud(self, crud_infos):
+        for crud_info in crud_infos:
+            self.crud(crud_info)
+
+    def bulk_login(self, login_infos):
+        for login_info in login_infos:
+            self.login(login_info)
+
+    # Appending a line to a local file is cheap enough to be done on the event loop.
+    async def arequest(self, request_info):
+        return self.request(request_info)
+
+
+# Larger events are written directly instead of being sent to the collector. It is
+# below the default send buffer size of Linux (208 KiB), which bounds the size of a
+# datagram; the send buffer size of the socket lowers it further where smaller.
+MAX_DATAGRAM_SIZE = 200 * 1024
+
+
+class CollectorBackend(ModelBackend):
+    """Send events to the `easyaudit_collector` process over a Unix domain socket.
+
+    An event is written directly to the database, as `ModelBackend` does, whenever
+    it cannot be sent: the collector is not running, its socket buffer is full or
+    the event does not fit in a datagram.
+    """
+
+    def __init__(self, socket_path=None):
+        socket_path = socket_path or COLLECTOR_SOCKET
+        if not socket_path:
+            raise ImproperlyConfigured(
+                "CollectorBackend requires DJANGO_EASY_AUDIT_COLLECTOR_SOCKET."
+            )
+        self.socket_path = str(socket_path)
+        self._socket = None
+        self._pid = None
+        self._max_size = MAX_DATAGRAM_SIZE
+        self._available = True
+
+    def _send(self, kind, info):
+        if self._pid != os.getpid():
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            # Never wait for the collector: write the event directly instead.
+            self._socket.setblocking(False)
+            self._pid = os.getpid()
+            self._max_size = min(
+                MAX_DATAGRAM_SIZE,
+                self._socket.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF),
+            )
+
+        payload = dump_event(kind, info).encode()
+        if len(payload) > self._max_size:
+            return False
+        try:
+            self._socket.sendto(payload, self.socket_path)
+        except OSError as exc:
+            # The event is too large for the socket, not the collector unavailable.
+            if exc.errno == errno.EMSGSIZE:
+                return False
+            if self._available:
+                logger.warning(
+                    f"easy audit collector unavailable on {self.socket_path}, "
+                    "writing events directly.",
+                    exc_info=True,
+                )
+            self._available = False
+            return False
+
+        self._available = True
+        return True
+
+    def close(self):
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+            self._pid = None
+
+    def request(self, request_info):
+        if not self._send("request", request_info):
+            super().request(request_info)
+        return request_info
+
+    def crud(self, crud_info):
+        if not self._send("crud", crud_info):
+            super().crud(crud_info)
+        return crud_info
+
+    def login(self, login_info):
+        if not self._send("login", login_info):
+            super().login(login_info)
+        return login_info
+
+    def bulk_request(self, request_infos):
+        unsent = [info for info in request_infos if not self._send("request", info)]
+        if unsent:
+            super().bulk_request(unsent)
+
+    def bulk_crud(self, crud_infos):
+        unsent = [info for info in crud_infos if not self._send("crud", info)]
+        if unsent:
+            super().bulk_crud(unsent)
+
+    def bulk_login(self, login_infos):
+        unsent = [info for info in login_infos if not self._send("login", info)]
+        if unsent:
+            super().bulk_login(unsent)
+
+    async def arequest(self, request_info):
+        if not self._send("request", request_info):
+            await super().arequest(request_info)
+        return request_info
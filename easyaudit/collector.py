@@ -0,0 +1,61 @@
+"""Collect the audit events of many worker processes in a single process.
+
+Workers logging with `easyaudit.backends.CollectorBackend` send every event as a
+datagram over a Unix domain socket to the process running the
+`easyaudit_collector` management command, which writes the events of all the
+workers in batches, from a single database connection.
+"""
+
+import contextlib
+import logging
+import os
+import socket
+
+from easyaudit.backends import MAX_DATAGRAM_SIZE, ModelBackend, QueuedWriter
+from easyaudit.utils import load_event
+
+logger = logging.getLogger(__name__)
+
+
+class Collector:
+    """Receive events on `socket_path` and hand them to a `QueuedWriter`.
+
+    While the writer is busy, events wait in the queue and then in the socket
+    buffer; once both are full, workers write their events themselves.
+    """
+
+    def __init__(self, socket_path, **writer_kwargs):
+        self.socket_path = str(socket_path)
+        self.writer = QueuedWriter(ModelBackend(), full_policy="block", **writer_kwargs)
+        self._running = False
+
+    def serve_forever(self, poll_interval=0.5):
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.socket_path)
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.bind(self.socket_path)
+        sock.settimeout(poll_interval)
+        buffer = bytearray(MAX_DATAGRAM_SIZE)
+        self._running = True
+        try:
+            while self._running:
+                try:
+                    size = sock.recv_into(buffer)
+                except socket.timeout:
+                    continue
+                try:
+                    kind, info = load_event(buffer[:size].decode())
+                except ValueError:
+                    logger.warning("easy audit collector received an unreadable event.")
+                    continue
+                self.writer.put(kind, info)
+        finally:
+            sock.close()
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self.socket_path)
+            self.writer.stop()
+
+    def shutdown(self):
+        """Stop receiving events; `serve_forever` returns once they are written."""
+        self._running = False
@@ -0,0 +1,41 @@
+import signal
+
+from django.core.management.base import BaseCommand, CommandError
+
+from easyaudit.collector import Collector
+from easyaudit.settings import BUFFER_SIZE, COLLECTOR_SOCKET
+
+
+class Command(BaseCommand):
+    help = (
+        "Receive the events of the workers logging with "
+        "easyaudit.backends.CollectorBackend and write them in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--socket",
+            default=COLLECTOR_SOCKET,
+            help="Unix domain socket path. Defaults to DJANGO_EASY_AUDIT_COLLECTOR_SOCKET.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BUFFER_SIZE,
+            help="Maximum number of events per bulk insert.",
+        )
+
+    def handle(self, *args, socket, batch_size, **options):
+        if not socket:
+            raise CommandError("No socket path given.")
+
+        collector = Collector(socket, batch_size=batch_size)
+
+        def shutdown(signum, frame):
+            collector.shutdown()
+
+        signal.signal(signal.SIGINT, shutdown)
+        signal.signal(signal.SIGTERM, shutdown)
+
+        self.stdout.write(f"Collecting audit events on {socket}")
+        collector.serve_forever()
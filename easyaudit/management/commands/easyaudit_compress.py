@@ -0,0 +1,72 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from easyaudit.models import CRUDEvent
+from easyaudit.settings import COMPRESS_MIN_SIZE, DATABASE_ALIAS
+from easyaudit.utils import compress_event_fields
+
+
+class Command(BaseCommand):
+    help = (
+        "Compress the object JSON representation and the changed fields of the "
+        "existing CRUD events."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of events read and updated at a time.",
+        )
+        parser.add_argument(
+            "--min-size",
+            type=int,
+            default=COMPRESS_MIN_SIZE,
+            help=(
+                "Leave shorter texts uncompressed. Defaults to "
+                "DJANGO_EASY_AUDIT_COMPRESS_MIN_SIZE."
+            ),
+        )
+
+    def handle(self, *args, batch_size, min_size, **options):
+        fields = CRUDEvent.COMPRESSED_FIELDS
+        queryset = (
+            CRUDEvent.objects.using(DATABASE_ALIAS)
+            .filter(Q(object_json_repr_compressed=None) | Q(changed_fields_compressed=None))
+            .only("pk", *fields, *fields.values())
+            .order_by("pk")
+        )
+
+        compressed = 0
+        last_pk = None
+        while True:
+            batch = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+            events = list(batch[:batch_size])
+            if not events:
+                break
+            last_pk = events[-1].pk
+
+            updated = []
+            for event in events:
+                # Leave the fields that are already compressed alone.
+                uncompressed = {
+                    name: compressed_name
+                    for name, compressed_name in fields.items()
+                    if getattr(event, compressed_name) is None
+                }
+                info = {name: getattr(event, name) for name in uncompressed}
+                info = compress_event_fields(info, uncompressed, min_size)
+                if len(info) > len(uncompressed):
+                    for name, value in info.items():
+                        setattr(event, name, value)
+                    updated.append(event)
+
+            with transaction.atomic(using=DATABASE_ALIAS):
+                CRUDEvent.objects.using(DATABASE_ALIAS).bulk_update(
+                    updated, [*fields, *fields.values()]
+                )
+            compressed += len(updated)
+
+        self.stdout.write(f"Compressed {compressed} CRUD events.")
@@ -0,0 +1,77 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from easyaudit.backends import ModelBackend
+from easyaudit.models import IngestedSegment
+from easyaudit.settings import DATABASE_ALIAS, SPOOL_DIR
+from easyaudit.spool import read_segment, seal_orphaned_segments, sealed_segments
+
+
+class Command(BaseCommand):
+    help = (
+        "Load the sealed segments written by easyaudit.backends.SpoolBackend into the "
+        "audit tables, then delete them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--spool-dir",
+            default=SPOOL_DIR,
+            help="Spool directory. Defaults to DJANGO_EASY_AUDIT_SPOOL_DIR.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of events per bulk insert.",
+        )
+        parser.add_argument(
+            "--seal-orphans",
+            action="store_true",
+            help=(
+                "Seal, and ingest, the open segments of processes that are no longer "
+                "running. POSIX only."
+            ),
+        )
+
+    def handle(self, *args, spool_dir, batch_size, seal_orphans, **options):
+        if not spool_dir:
+            raise CommandError("No spool directory given.")
+        if seal_orphans:
+            if os.name != "posix":
+                raise CommandError("--seal-orphans is only supported on POSIX systems.")
+            seal_orphaned_segments(spool_dir)
+
+        backend = ModelBackend()
+        for path in sealed_segments(spool_dir):
+            events = self.ingest(path, backend, batch_size)
+            # The segment is only deleted once its events are committed. If that
+            # fails, the next run finds the segment in IngestedSegment and skips it.
+            path.unlink()
+            if events is None:
+                self.stdout.write(f"{path.name}: already ingested")
+            else:
+                self.stdout.write(f"{path.name}: {events} events")
+
+    def ingest(self, path, backend, batch_size):
+        with transaction.atomic(using=DATABASE_ALIAS):
+            if IngestedSegment.objects.filter(name=path.name).exists():
+                return None
+
+            events = 0
+            batches = {"crud": [], "login": [], "request": []}
+            for kind, info in read_segment(path):
+                batches[kind].append(info)
+                events += 1
+                if len(batches[kind]) >= batch_size:
+                    getattr(backend, f"bulk_{kind}")(batches[kind])
+                    batches[kind] = []
+            for kind, infos in batches.items():
+                if infos:
+                    getattr(backend, f"bulk_{kind}")(infos)
+
+            # Unique: a concurrent run ingesting the same segment fails here.
+            IngestedSegment.objects.create(name=path.name, events=events)
+        return events
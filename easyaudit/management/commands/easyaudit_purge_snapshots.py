@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from easyaudit.backends import snapshot_store
+
+
+class Command(BaseCommand):
+    help = "Delete the snapshots that no CRUD event refers to any longer."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database",
+            default=None,
+            help="Database to delete the snapshots from. Defaults to the one written to.",
+        )
+
+    def handle(self, *args, database, **options):
+        deleted = snapshot_store.delete_orphans(using=database)
+        self.stdout.write(f"Deleted {deleted} snapshots.")
@@ -0,0 +1,253 @@
+"""QuerySets and managers that audit set-based operations.
+
+`QuerySet.update()`, `bulk_create()` and `bulk_update()` send no model signals, so
+the rows they change are not audited by the signal receivers. Give a model an
+`AuditedManager`, or build a manager of your own from a QuerySet with
+`AuditedQuerySetMixin`, to log them:
+
+    class Book(models.Model):
+        objects = AuditedManager()
+
+`update()` reads the affected rows before the update, in one query, locking them
+where the database supports it. It then updates them by primary key and reads them
+again, in batches as large as the database allows. `bulk_update()` reads them before
+the update, in one query. The events of each call are logged with a single bulk
+insert, deletions included. `bulk_create()` calls that
+ignore or update conflicting rows are not audited.
+"""
+
+import json
+from functools import partial
+
+from django.conf import settings
+from django.db import connections, models, transaction
+
+from easyaudit.models import CRUDEvent
+from easyaudit.utils import model_deltas, serialize_instances
+
+
+def _signals():
+    # Imported on first use: this module is imported by models modules, before the
+    # models the settings of Django Easy Audit refer to are loaded.
+    from easyaudit.signals import crud_flows, model_signals
+
+    return crud_flows, model_signals
+
+
+def _log_updates(old_instances, new_instances, fields, using):
+    """Log an UPDATE event for each pair of instances, with a single bulk insert."""
+    crud_flows, model_signals = _signals()
+    deltas = model_deltas(old_instances, new_instances, fields)
+    object_json_reprs = serialize_instances(new_instances)
+
+    skip_unchanged = getattr(
+        settings, "DJANGO_EASY_AUDIT_CRUD_EVENT_NO_CHANGED_FIELDS_SKIP", False
+    )
+    update_fields = frozenset(field.name for field in fields)
+    logged = [
+        (instance, object_json_repr, delta)
+        for instance, object_json_repr, delta in zip(
+            new_instances, object_json_reprs, deltas
+        )
+        if not (skip_unchanged and delta is None)
+        and model_signals.call_callbacks(
+            instance, object_json_repr, False, False, using, update_fields
+        )
+    ]
+    if not logged:
+        return
+    instances, object_json_reprs, deltas = zip(*logged)
+    crud_flow = partial(
+        crud_flows.bulk_crud_flow,
+        CRUDEvent.UPDATE,
+        instances,
+        [instance.pk for instance in instances],
+        object_json_reprs,
+        changed_fields=[json.dumps(delta) for delta in deltas],
+    )
+    crud_flows.schedule_crud_flow(crud_flow, using=using)
+
+
+class AuditedQuerySetMixin:
+    """Log a CRUD event for each row changed by a set-based operation.
+
+    `update()`, `delete()`, `bulk_create()` and `bulk_update()` are audited.
+    """
+
+    def _unaudited(self):
+        # A plain QuerySet of the same rows: Django implements some set-based
+        # operations with others, which must not log the same rows twice.
+        return models.QuerySet(
+            model=self.model, query=self.query.chain(), using=self._db, hints=self._hints
+        )
+
+    def update(self, **kwargs):
+        _, model_signals = _signals()
+        if not kwargs or not model_signals.should_audit_model(self.model):
+            return super().update(**kwargs)
+
+        if self.query.is_sliced:
+            raise TypeError("Cannot update a query once a slice has been taken.")
+        using = self.db
+        fields = [self.model._meta.get_field(name) for name in kwargs]
+        features = connections[using].features
+        rows = self
+        if features.has_select_for_update:
+            rows = self.select_for_update(
+                **({"of": ("self",)} if features.has_select_for_update_of else {})
+            )
+        base_manager = self.model._base_manager.db_manager(using)
+        with transaction.atomic(using=using, savepoint=False):
+            # The rows read are locked, and updated by primary key, so that the rows
+            # updated are the rows audited, whatever other transactions commit.
+            old_instances = list(rows)
+            if not old_instances:
+                return 0
+            pks = [instance.pk for instance in old_instances]
+            # In batches, as the database limits the parameters of a query.
+            batch_size = max(
+                connections[using].ops.bulk_batch_size([self.model._meta.pk], pks), 1
+            )
+            updated = 0
+            new_instances = {}
+            for start in range(0, len(pks), batch_size):
+                batch = pks[start : start + batch_size]
+                updated += base_manager.filter(pk__in=batch).update(**kwargs)
+                new_instances.update(base_manager.in_bulk(batch))
+
+        # Rows whose primary key was updated are not found again.
+        pairs = [
+            (old_instance, new_instances[old_instance.pk])
+            for old_instance in old_instances
+            if old_instance.pk in new_instances
+        ]
+        _log_updates(
+            [old_instance for old_instance, _ in pairs],
+            [new_instance for _, new_instance in pairs],
+            fields,
+            using,
+        )
+        return updated
+
+    update.alters_data = True
+
+    def bulk_create(  # noqa: PLR0913, PLR0917
+        self,
+        objs,
+        batch_size=None,
+        ignore_conflicts=False,
+        update_conflicts=False,
+        update_fields=None,
+        unique_fields=None,
+    ):
+        crud_flows, model_signals = _signals()
+        objs = super().bulk_create(
+            objs,
+            batch_size=batch_size,
+            ignore_conflicts=ignore_conflicts,
+            update_conflicts=update_conflicts,
+            update_fields=update_fields,
+            unique_fields=unique_fields,
+        )
+        # On a conflict, the rows that were created cannot be told apart from the
+        # rows that were ignored or updated: those calls are not audited.
+        if (
+            ignore_conflicts
+            or update_conflicts
+            or not model_signals.should_audit_model(self.model)
+        ):
+            return objs
+
+        # The primary keys are only set on databases that return them.
+        created = [obj for obj in objs if obj.pk is not None]
+        if not created:
+            return objs
+        using = self.db
+        object_json_reprs = serialize_instances(created)
+        logged = [
+            (instance, object_json_repr)
+            for instance, object_json_repr in zip(created, object_json_reprs)
+            if model_signals.call_callbacks(
+                instance, object_json_repr, True, False, using, None
+            )
+        ]
+        if logged:
+            instances, object_json_reprs = zip(*logged)
+            crud_flow = partial(
+                crud_flows.bulk_crud_flow,
+                CRUDEvent.CREATE,
+                instances,
+                [instance.pk for instance in instances],
+                object_json_reprs,
+            )
+            crud_flows.schedule_crud_flow(crud_flow, using=using)
+        return objs
+
+    bulk_create.alters_data = True
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        _, model_signals = _signals()
+        objs = list(objs)
+        if not objs or not model_signals.should_audit_model(self.model):
+            return super().bulk_update(objs, fields, *args, **kwargs)
+
+        using = self.db
+        model_fields = [self.model._meta.get_field(name) for name in fields]
+        with transaction.atomic(using=using, savepoint=False):
+            old_instances = self.model._base_manager.db_manager(using).in_bulk(
+                [obj.pk for obj in objs]
+            )
+            rows = self._unaudited().bulk_update(objs, fields, *args, **kwargs)
+
+        new_instances = [obj for obj in objs if obj.pk in old_instances]
+        _log_updates(
+            [old_instances[obj.pk] for obj in new_instances],
+            new_instances,
+            model_fields,
+            using,
+        )
+        return rows
+
+    bulk_update.alters_data = True
+
+    def delete(self):
+        crud_flows, model_signals = _signals()
+        if not model_signals.should_audit_model(self.model):
+            return super().delete()
+
+        # Django fetches the rows, and sends `post_delete` for each of them, so as
+        # to delete them: catch the instances there rather than fetching them again.
+        with model_signals.capture_deletes() as deleted:
+            result = super().delete()
+
+        if deleted:
+            instances = [instance for instance, _ in deleted]
+            object_ids = [pk for _, pk in deleted]
+            for instance, pk in deleted:
+                setattr(instance, instance._meta.pk.attname, pk)
+            try:
+                object_json_reprs = serialize_instances(instances)
+            finally:
+                for instance in instances:
+                    setattr(instance, instance._meta.pk.attname, None)
+
+            crud_flow = partial(
+                crud_flows.bulk_crud_flow,
+                CRUDEvent.DELETE,
+                instances,
+                object_ids,
+                object_json_reprs,
+            )
+            crud_flows.schedule_crud_flow(crud_flow, using=self.db)
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
+class AuditedQuerySet(AuditedQuerySetMixin, models.QuerySet):
+    pass
+
+
+class AuditedManager(models.Manager.from_queryset(AuditedQuerySet)):
+    pass
@@ -38,6 +38,13 @@ def set_current_user(user):
         _thread_locals.request = request
 
 
+def _load_user(request):
+    user = getattr(request, "user", None)
+    # `request.user` is lazy: load it here.
+    getattr(user, "id", None)
+    return user
+
+
 def clear_request():
     with contextlib.suppress(AttributeError):
         del _thread_locals.request
@@ -56,7 +63,17 @@ class EasyAuditMiddleware:
         if iscoroutinefunction(self):
             return self.__acall__(request)
 
+        # Imported on first use: the signals modules import this module.
+        from easyaudit.signals.request_signals import (
+            log_request_event,
+            take_pending_request_event,
+        )
+
         _thread_locals.request = request
+        pending = take_pending_request_event(request)
+        if pending is not None:
+            log_request_event(pending.request_info, _load_user(request))
+
         response = self.get_response(request)
 
         self._register_commit_callback(request, response)
@@ -64,11 +81,26 @@ class EasyAuditMiddleware:
         return response
 
     async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        from easyaudit.signals.request_signals import (
+            alog_request_event,
+            take_pending_request_event,
+        )
+
         _thread_locals.request = request
+        pending = take_pending_request_event(request)
+        if pending is not None:
+            if hasattr(request, "auser"):
+                user = await request.auser()
+            else:
+                user = await sync_to_async(_load_user)(request)
+            await alog_request_event(pending.request_info, user)
 
         response = await self.get_response(request)
 
-        await sync_to_async(self._register_commit_callback)(request, response)
+        # Async code never runs inside a transaction (even a sync view's
+        # ATOMIC_REQUESTS transaction is over by now), so `on_commit()` would run
+        # the cleanup right away: do it here rather than hop to a thread for it.
+        self._thread_cleanup(request, response)
 
         return response
 
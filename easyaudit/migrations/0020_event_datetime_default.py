@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:39
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('easyaudit', '0004_auto_20170620_1354_squashed_0019_alter_crudevent_changed_fields_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='crudevent',
+            name='datetime',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='Date time'),
+        ),
+        migrations.AlterField(
+            model_name='loginevent',
+            name='datetime',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='Date time'),
+        ),
+        migrations.AlterField(
+            model_name='requestevent',
+            name='datetime',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Date time'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:46
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('easyaudit', '0020_event_datetime_default'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestedSegment',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Name')),
+                ('events', models.PositiveIntegerField(default=0, verbose_name='Events')),
+                ('datetime', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Date time')),
+            ],
+            options={
+                'verbose_name': 'ingested segment',
+                'verbose_name_plural': 'ingested segments',
+                'ordering': ['-datetime'],
+            },
+        ),
+    ]
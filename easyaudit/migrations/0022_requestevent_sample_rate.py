@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('easyaudit', '0021_ingestedsegment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='requestevent',
+            name='sample_rate',
+            field=models.FloatField(default=1.0, help_text='The fraction of the requests to this URL that were logged.', verbose_name='Sample rate'),
+        ),
+    ]
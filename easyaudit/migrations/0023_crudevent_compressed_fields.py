@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('easyaudit', '0022_requestevent_sample_rate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='crudevent',
+            name='changed_fields_compressed',
+            field=models.BinaryField(blank=True, null=True, verbose_name='Compressed changed fields'),
+        ),
+        migrations.AddField(
+            model_name='crudevent',
+            name='object_json_repr_compressed',
+            field=models.BinaryField(blank=True, null=True, verbose_name='Compressed object JSON representation'),
+        ),
+    ]
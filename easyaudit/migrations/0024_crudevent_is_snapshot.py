@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('easyaudit', '0023_crudevent_compressed_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='crudevent',
+            name='is_snapshot',
+            field=models.BooleanField(default=True, help_text='Whether the object JSON representation holds every field of the object, or only the changed ones.', verbose_name='Is snapshot'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('easyaudit', '0024_crudevent_is_snapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Snapshot',
+            fields=[
+                ('hash', models.CharField(max_length=64, primary_key=True, serialize=False, verbose_name='Hash')),
+                ('data', models.TextField(verbose_name='Object JSON representation')),
+            ],
+            options={
+                'verbose_name': 'snapshot',
+                'verbose_name_plural': 'snapshots',
+            },
+        ),
+        migrations.AddField(
+            model_name='crudevent',
+            name='object_json_repr_hash',
+            field=models.CharField(blank=True, default='', help_text='Hash of the object JSON representation, if stored as a snapshot', max_length=64, verbose_name='Object JSON representation hash'),
+        ),
+    ]
@@ -1,8 +1,13 @@
+import json
+
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.db import models
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from easyaudit.utils import decompress_text
+
 
 class CRUDEvent(models.Model):
     CREATE = 1
@@ -48,6 +53,19 @@ class CRUDEvent(models.Model):
     changed_fields = models.TextField(
         default="", blank=True, verbose_name=_("Changed fields")
     )
+    object_json_repr_compressed = models.BinaryField(
+        null=True, blank=True, verbose_name=_("Compressed object JSON representation")
+    )
+    changed_fields_compressed = models.BinaryField(
+        null=True, blank=True, verbose_name=_("Compressed changed fields")
+    )
+    object_json_repr_hash = models.CharField(
+        max_length=64,
+        default="",
+        blank=True,
+        help_text=_("Hash of the object JSON representation, if stored as a snapshot"),
+        verbose_name=_("Object JSON representation hash"),
+    )
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         null=True,
@@ -63,7 +81,15 @@ class CRUDEvent(models.Model):
         help_text=_("String version of the user pk"),
         verbose_name=_("User PK as string"),
     )
-    datetime = models.DateTimeField(auto_now_add=True, verbose_name=_("Date time"))
+    datetime = models.DateTimeField(default=timezone.now, verbose_name=_("Date time"))
+    is_snapshot = models.BooleanField(
+        default=True,
+        help_text=_(
+            "Whether the object JSON representation holds every field of the object, "
+            "or only the changed ones."
+        ),
+        verbose_name=_("Is snapshot"),
+    )
 
     class Meta:
         verbose_name = _("CRUD event")
@@ -71,6 +97,66 @@ class CRUDEvent(models.Model):
         ordering = ["-datetime"]
         indexes = [models.Index(fields=["object_id", "content_type"])]
 
+    # Text fields whose value may be stored zlib compressed in a binary field instead.
+    COMPRESSED_FIELDS = {
+        "object_json_repr": "object_json_repr_compressed",
+        "changed_fields": "changed_fields_compressed",
+    }
+
+    def _get_text(self, name):
+        compressed = getattr(self, self.COMPRESSED_FIELDS[name])
+        if compressed is None:
+            return getattr(self, name)
+        return decompress_text(compressed)
+
+    def get_object_json_repr(self):
+        """Get the object JSON representation, decompressed if need be."""
+        if self.object_json_repr_hash:
+            return (
+                Snapshot.objects.using(self._state.db)
+                .values_list("data", flat=True)
+                .get(hash=self.object_json_repr_hash)
+            )
+        return self._get_text("object_json_repr")
+
+    def get_changed_fields(self):
+        """Get the changed fields, decompressed if need be."""
+        return self._get_text("changed_fields")
+
+    def get_full_object_json_repr(self):
+        """Get the object JSON representation with every field of the object.
+
+        For an event storing only the changed fields, it is rebuilt by applying the
+        changes of the events since the latest snapshot of the object to that
+        snapshot.
+        """
+        if self.is_snapshot:
+            return self.get_object_json_repr()
+
+        history = CRUDEvent.objects.using(self._state.db).filter(
+            content_type_id=self.content_type_id, object_id=self.object_id
+        )
+        snapshot = (
+            history.filter(is_snapshot=True)
+            .filter(_logged_before(self))
+            .order_by("-datetime", "-pk")
+            .first()
+        )
+        changes = history.filter(is_snapshot=False).filter(_logged_before(self))
+        if snapshot is None:
+            state = None
+        else:
+            state = json.loads(snapshot.get_object_json_repr())
+            changes = changes.exclude(_logged_before(snapshot)).exclude(pk=snapshot.pk)
+
+        for event in [*changes.order_by("datetime", "pk"), self]:
+            fields = json.loads(event.get_object_json_repr())
+            if state is None:
+                state = fields
+            else:
+                state[0]["fields"].update(fields[0]["fields"])
+        return json.dumps(state, ensure_ascii=False)
+
     def is_create(self):
         return self.event_type == self.CREATE
 
@@ -81,6 +167,24 @@ class CRUDEvent(models.Model):
         return self.event_type == self.DELETE
 
 
+def _logged_before(event):
+    """Filter the events logged before `event`."""
+    return models.Q(datetime__lt=event.datetime) | models.Q(
+        datetime=event.datetime, pk__lt=event.pk
+    )
+
+
+class Snapshot(models.Model):
+    """An object JSON representation, shared by the CRUD events that have it."""
+
+    hash = models.CharField(max_length=64, primary_key=True, verbose_name=_("Hash"))
+    data = models.TextField(verbose_name=_("Object JSON representation"))
+
+    class Meta:
+        verbose_name = _("snapshot")
+        verbose_name_plural = _("snapshots")
+
+
 class LoginEvent(models.Model):
     LOGIN = 0
     LOGOUT = 1
@@ -105,7 +209,7 @@ class LoginEvent(models.Model):
     remote_ip = models.CharField(
         max_length=50, default="", db_index=True, verbose_name=_("Remote IP")
     )
-    datetime = models.DateTimeField(auto_now_add=True, verbose_name=_("Date time"))
+    datetime = models.DateTimeField(default=timezone.now, verbose_name=_("Date time"))
 
     class Meta:
         verbose_name = _("login event")
@@ -131,10 +235,32 @@ class RequestEvent(models.Model):
         max_length=50, default="", db_index=True, verbose_name=_("Remote IP")
     )
     datetime = models.DateTimeField(
-        auto_now_add=True, db_index=True, verbose_name=_("Date time")
+        default=timezone.now, db_index=True, verbose_name=_("Date time")
+    )
+    sample_rate = models.FloatField(
+        default=1.0,
+        help_text=_("The fraction of the requests to this URL that were logged."),
+        verbose_name=_("Sample rate"),
     )
 
     class Meta:
         verbose_name = _("request event")
         verbose_name_plural = _("request events")
         ordering = ["-datetime"]
+
+
+class IngestedSegment(models.Model):
+    """A spool segment loaded by the `easyaudit_ingest` management command.
+
+    It is created in the same transaction as the events of the segment, so that a
+    segment is never ingested twice.
+    """
+
+    name = models.CharField(max_length=255, unique=True, verbose_name=_("Name"))
+    events = models.PositiveIntegerField(default=0, verbose_name=_("Events"))
+    datetime = models.DateTimeField(default=timezone.now, verbose_name=_("Date time"))
+
+    class Meta:
+        verbose_name = _("ingested segment")
+        verbose_name_plural = _("ingested segments")
+        ordering = ["-datetime"]
@@ -9,7 +9,13 @@ from django.contrib.sessions.models import Session
 from django.db.migrations import Migration
 from django.db.migrations.recorder import MigrationRecorder
 
-from easyaudit.models import CRUDEvent, LoginEvent, RequestEvent
+from easyaudit.models import (
+    CRUDEvent,
+    IngestedSegment,
+    LoginEvent,
+    RequestEvent,
+    Snapshot,
+)
 
 
 def get_model_list(class_list):
@@ -28,6 +34,14 @@ def get_model_list(class_list):
 WATCH_AUTH_EVENTS = getattr(settings, "DJANGO_EASY_AUDIT_WATCH_AUTH_EVENTS", True)
 WATCH_MODEL_EVENTS = getattr(settings, "DJANGO_EASY_AUDIT_WATCH_MODEL_EVENTS", True)
 WATCH_REQUEST_EVENTS = getattr(settings, "DJANGO_EASY_AUDIT_WATCH_REQUEST_EVENTS", True)
+# Should request events be logged by `EasyAuditMiddleware`, with the user set by the
+# authentication middleware, rather than when requests start?
+REQUEST_EVENTS_FROM_MIDDLEWARE = getattr(
+    settings, "DJANGO_EASY_AUDIT_REQUEST_EVENTS_FROM_MIDDLEWARE", False
+)
+# Should request events be written after the responses have been sent, in batches
+# of `BUFFER_SIZE` events, rather than before the views run?
+DEFER_REQUEST_EVENTS = getattr(settings, "DJANGO_EASY_AUDIT_DEFER_REQUEST_EVENTS", False)
 REMOTE_ADDR_HEADER = getattr(
     settings, "DJANGO_EASY_AUDIT_REMOTE_ADDR_HEADER", "REMOTE_ADDR"
 )
@@ -39,6 +53,70 @@ LOGGING_BACKEND = getattr(
     settings, "DJANGO_EASY_AUDIT_LOGGING_BACKEND", "easyaudit.backends.ModelBackend"
 )
 
+# BufferedModelBackend settings: how many events may be pending, and how many
+# seconds may pass, before the buffered events are written to the database.
+BUFFER_SIZE = getattr(settings, "DJANGO_EASY_AUDIT_BUFFER_SIZE", 100)
+BUFFER_FLUSH_INTERVAL = getattr(settings, "DJANGO_EASY_AUDIT_BUFFER_FLUSH_INTERVAL", 5)
+
+# QueuedModelBackend settings: the maximum number of queued events, what to do with
+# an event when the queue is full ("block", "drop_oldest", "drop_newest" or
+# "spill") and the directory events are spilled to.
+QUEUE_SIZE = getattr(settings, "DJANGO_EASY_AUDIT_QUEUE_SIZE", 10000)
+QUEUE_FULL_POLICY = getattr(settings, "DJANGO_EASY_AUDIT_QUEUE_FULL_POLICY", "block")
+QUEUE_SPILL_DIR = getattr(settings, "DJANGO_EASY_AUDIT_QUEUE_SPILL_DIR", None)
+
+# SpoolBackend settings: the directory segment files are written to, and the size
+# (in bytes) and age (in seconds) at which a segment is sealed for ingestion.
+SPOOL_DIR = getattr(settings, "DJANGO_EASY_AUDIT_SPOOL_DIR", None)
+SPOOL_SEGMENT_SIZE = getattr(
+    settings, "DJANGO_EASY_AUDIT_SPOOL_SEGMENT_SIZE", 16 * 1024 * 1024
+)
+SPOOL_SEGMENT_AGE = getattr(settings, "DJANGO_EASY_AUDIT_SPOOL_SEGMENT_AGE", 60)
+
+# CollectorBackend setting: the Unix domain socket the `easyaudit_collector`
+# management command receives events on.
+COLLECTOR_SOCKET = getattr(settings, "DJANGO_EASY_AUDIT_COLLECTOR_SOCKET", None)
+
+# CompositeBackend setting: the backends every event is dispatched to, as dotted
+# paths or as {"BACKEND": dotted path, "OPTIONS": QueuedWriter options} dicts.
+COMPOSITE_BACKENDS = getattr(settings, "DJANGO_EASY_AUDIT_COMPOSITE_BACKENDS", [])
+
+# Compressed storage: when enabled, the object JSON representation and the changed
+# fields of CRUD events are stored zlib compressed, if at least COMPRESS_MIN_SIZE
+# characters long.
+COMPRESS_JSON = getattr(settings, "DJANGO_EASY_AUDIT_COMPRESS_JSON", False)
+COMPRESS_MIN_SIZE = getattr(settings, "DJANGO_EASY_AUDIT_COMPRESS_MIN_SIZE", 256)
+
+# Deduplicated storage: when enabled, the object JSON representation of CRUD events
+# is stored once in the Snapshot table, keyed by its SHA-256 hash, and the hashes of
+# the SNAPSHOT_CACHE_SIZE latest snapshots stored by a process are remembered.
+DEDUPLICATE_SNAPSHOTS = getattr(settings, "DJANGO_EASY_AUDIT_DEDUPLICATE_SNAPSHOTS", False)
+SNAPSHOT_CACHE_SIZE = getattr(settings, "DJANGO_EASY_AUDIT_SNAPSHOT_CACHE_SIZE", 1024)
+
+# Tracked state: when enabled, the field values of audited model instances are
+# recorded when loaded, refreshed and saved, and compared with on update instead of
+# the row selected from the database.
+TRACK_LOADED_STATE = getattr(settings, "DJANGO_EASY_AUDIT_TRACK_LOADED_STATE", False)
+
+# Delta storage of UPDATE events: when set to N, the object JSON representation of
+# an UPDATE event holds every field of the object only if none of the previous N - 1
+# events of the object did, and the changed fields alone otherwise.
+UPDATE_SNAPSHOT_INTERVAL = getattr(
+    settings, "DJANGO_EASY_AUDIT_UPDATE_SNAPSHOT_INTERVAL", None
+)
+
+# How long, in seconds, the existence of the current user is cached for outside of
+# requests (e.g. when set with `set_current_user()`). Within a request, it is
+# checked once.
+USER_EXISTS_CACHE_TTL = getattr(settings, "DJANGO_EASY_AUDIT_USER_EXISTS_CACHE_TTL", 5)
+
+# Savepoint-free receivers: when enabled, the receivers of the model signals only
+# open an atomic block (a savepoint, inside a transaction) around work that queries
+# the database, rather than around all of their work.
+SAVEPOINT_FREE_HANDLERS = getattr(
+    settings, "DJANGO_EASY_AUDIT_SAVEPOINT_FREE_HANDLERS", False
+)
+
 # Models which Django Easy Audit will not log.
 # By default, all but some models will be audited.
 # The list of excluded models can be overwritten or extended
@@ -47,6 +125,8 @@ UNREGISTERED_CLASSES = [
     CRUDEvent,
     LoginEvent,
     RequestEvent,
+    IngestedSegment,
+    Snapshot,
     Migration,
     Session,
     Permission,
@@ -96,6 +176,17 @@ UNREGISTERED_URLS.extend(getattr(settings, "DJANGO_EASY_AUDIT_UNREGISTERED_URLS_
 REGISTERED_URLS = getattr(settings, "DJANGO_EASY_AUDIT_REGISTERED_URLS", [])
 
 
+# Sampling of the logged URLs: a dict of regular expressions to the fraction of the
+# matching requests to log, e.g. {r"^/api/poll/": 0.01}. The first match applies.
+REQUEST_SAMPLING = getattr(settings, "DJANGO_EASY_AUDIT_REQUEST_SAMPLING", {})
+
+# Rate limits of the logged URLs: a dict of regular expressions to (events, seconds)
+# tuples, the number of requests to a matching URL logged per client and URL in a
+# period. The first match applies. The sample rate of a logged request accounts for
+# the requests skipped before it.
+REQUEST_RATE_LIMITS = getattr(settings, "DJANGO_EASY_AUDIT_REQUEST_RATE_LIMITS", {})
+
+
 # By default all modules are listed in the admin.
 # This can be changed with the following settings.
 ADMIN_SHOW_MODEL_EVENTS = getattr(
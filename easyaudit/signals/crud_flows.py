@@ -1,23 +1,104 @@
 import contextlib
+import json
 import logging
+import threading
+import time
 from uuid import UUID
 
+from asgiref.local import Local
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AnonymousUser
 from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ObjectDoesNotExist
 from django.db import transaction
+from django.db.models import signals
 from django.utils import timezone
 from django.utils.module_loading import import_string
 
-from easyaudit.middleware.easyaudit import get_current_user
+from easyaudit.middleware.easyaudit import (
+    MockRequest,
+    get_current_request,
+    get_current_user,
+)
 from easyaudit.models import CRUDEvent
-from easyaudit.settings import DATABASE_ALIAS, LOGGING_BACKEND
+from easyaudit.settings import (
+    DATABASE_ALIAS,
+    LOGGING_BACKEND,
+    UPDATE_SNAPSHOT_INTERVAL,
+    USER_EXISTS_CACHE_TTL,
+)
 from easyaudit.utils import get_m2m_field_name, should_propagate_exceptions
 
 logger = logging.getLogger(__name__)
 audit_logger = import_string(LOGGING_BACKEND)()
 
+# The most users whose existence is cached outside of requests.
+USER_DETAILS_CACHE_SIZE = 1000
+
+# Per-thread state of the transaction collectors. Like database connections, it
+# must not be shared between the threads of a process.
+_collector_locals = Local(thread_critical=True)
+
+
+# The details of the users found to exist outside of requests, by primary key, with
+# the time they expire at. It is shared by the threads of the process.
+_user_details_cache = {}
+_user_details_lock = threading.Lock()
+
+
+def _get_user_details(user):
+    try:
+        # validate that the user still exists
+        user = get_user_model().objects.get(pk=user.pk)
+    except ObjectDoesNotExist:
+        return None, ""
+    return user.id, str(user.pk)
+
+
+def get_verified_user_details(user):
+    """Get the details of `user` if it still exists, checking once per request.
+
+    Outside of requests, the result is cached for `USER_EXISTS_CACHE_TTL` seconds.
+    """
+    request = get_current_request()
+    if request is not None and not isinstance(request, MockRequest):
+        cached = getattr(request, "_easyaudit_user_details", None)
+        if cached is None or cached[0] != user.pk:
+            cached = (user.pk, _get_user_details(user))
+            request._easyaudit_user_details = cached
+        return cached[1]
+
+    now = time.monotonic()
+    with _user_details_lock:
+        cached = _user_details_cache.get(user.pk)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+    user_details = _get_user_details(user)
+    if not USER_EXISTS_CACHE_TTL:
+        return user_details
+    with _user_details_lock:
+        if len(_user_details_cache) >= USER_DETAILS_CACHE_SIZE:
+            for pk, (expires, _) in list(_user_details_cache.items()):
+                if expires <= now:
+                    del _user_details_cache[pk]
+        if len(_user_details_cache) < USER_DETAILS_CACHE_SIZE:
+            _user_details_cache[user.pk] = (now + USER_EXISTS_CACHE_TTL, user_details)
+    return user_details
+
+
+def forget_user_details(sender, instance, **kwargs):
+    """Drop a deleted user from the cache of `get_verified_user_details()`."""
+    with _user_details_lock:
+        _user_details_cache.pop(instance.pk, None)
+
+
+signals.post_delete.connect(
+    forget_user_details,
+    sender=settings.AUTH_USER_MODEL,
+    dispatch_uid="easy_audit_forget_user_details",
+)
+
 
 def get_current_user_details():
     user_id = None
@@ -27,29 +108,184 @@ def get_current_user_details():
         user = get_current_user()
         if user and not isinstance(user, AnonymousUser):
             if getattr(settings, "DJANGO_EASY_AUDIT_CHECK_IF_REQUEST_USER_EXISTS", True):
-                # validate that the user still exists
-                user = get_user_model().objects.get(pk=user.pk)
+                return get_verified_user_details(user)
             user_id, user_pk_as_string = user.id, str(user.pk)
 
     return user_id, user_pk_as_string
 
 
+def get_crud_info(
+    event_type, instance, object_id, object_json_repr, user_details, **kwargs
+):
+    user_id, user_pk_as_string = user_details
+    return {
+        "content_type_id": ContentType.objects.get_for_model(instance).id,
+        "datetime": timezone.now(),
+        "event_type": event_type,
+        "object_id": object_id,
+        "object_json_repr": object_json_repr or "",
+        "object_repr": str(instance),
+        "user_id": user_id,
+        "user_pk_as_string": user_pk_as_string,
+        **kwargs,
+    }
+
+
 def log_event(event_type, instance, object_id, object_json_repr, **kwargs):
-    user_id, user_pk_as_string = get_current_user_details()
+    crud_info = get_crud_info(
+        event_type,
+        instance,
+        object_id,
+        object_json_repr,
+        get_current_user_details(),
+        **kwargs,
+    )
+
+    # A transaction collector is running its flows: leave the write to it.
+    collected = getattr(_collector_locals, "crud_infos", None)
+    if collected is not None:
+        collected.append(crud_info)
+        return
+
     with transaction.atomic(using=DATABASE_ALIAS):
-        audit_logger.crud(
-            {
-                "content_type_id": ContentType.objects.get_for_model(instance).id,
-                "datetime": timezone.now(),
-                "event_type": event_type,
-                "object_id": object_id,
-                "object_json_repr": object_json_repr or "",
-                "object_repr": str(instance),
-                "user_id": user_id,
-                "user_pk_as_string": user_pk_as_string,
-                **kwargs,
+        audit_logger.crud(crud_info)
+
+
+def log_events(crud_infos):
+    """Write several CRUD events at once, in bulk if the backend supports it."""
+    with transaction.atomic(using=DATABASE_ALIAS):
+        bulk_crud = getattr(audit_logger, "bulk_crud", None)
+        if bulk_crud is not None:
+            bulk_crud(crud_infos)
+        else:
+            for crud_info in crud_infos:
+                audit_logger.crud(crud_info)
+
+
+class _CommitHook:
+    """The `on_commit()` hook of the flows scheduled under a set of savepoints."""
+
+    def __init__(self, collector):
+        self.collector = collector
+
+    def __call__(self):
+        self.collector.run_through(self)
+
+
+class TransactionCollector:
+    """Collect the CRUD flows of a transaction and write their events on commit.
+
+    One collector is kept per transaction. Each flow is tagged with a hook that is
+    registered with `transaction.on_commit()` under the savepoints the flow was
+    scheduled from, so that a savepoint rollback drops the hook, and the flows
+    tagged with it are forgotten. When the transaction commits, the flows run in
+    the order they were scheduled and their events are written in bulk, in that
+    order too.
+    """
+
+    def __init__(self, using):
+        self.using = using
+        # (hook, crud_flow) pairs, in scheduling order.
+        self.crud_flows = []
+        self.hooks = {}
+        self.savepoint_ids = frozenset()
+        self.flows_run = 0
+
+    def _pending_hooks(self):
+        connection = transaction.get_connection(self.using)
+        return {id(func) for _, func, _ in connection.run_on_commit}
+
+    def is_pending(self):
+        pending = self._pending_hooks()
+        return any(id(hook) in pending for hook in self.hooks.values())
+
+    def add(self, crud_flow, savepoint_ids):
+        if savepoint_ids != self.savepoint_ids:
+            # A savepoint may have been rolled back since the previous flow: forget
+            # its flows. Those rolled back later are the last ones, and their hooks
+            # are never called.
+            pending = self._pending_hooks()
+            self.crud_flows = [
+                (hook, flow) for hook, flow in self.crud_flows if id(hook) in pending
+            ]
+            self.hooks = {
+                sids: hook for sids, hook in self.hooks.items() if id(hook) in pending
             }
-        )
+            self.savepoint_ids = savepoint_ids
+
+        hook = self.hooks.get(savepoint_ids)
+        if hook is None:
+            hook = self.hooks[savepoint_ids] = _CommitHook(self)
+            transaction.on_commit(hook, using=self.using)
+        self.crud_flows.append((hook, crud_flow))
+
+    def run_through(self, hook):
+        """Run the flows not run yet, up to the last one tagged with `hook`.
+
+        The hook was called, so its flows, and all the flows before them, were
+        committed.
+        """
+        collectors = _get_collectors()
+        if collectors.get(self.using) is self:
+            del collectors[self.using]
+
+        end = max(i for i, (tagged, _) in enumerate(self.crud_flows) if tagged is hook)
+        crud_flows = self.crud_flows[self.flows_run : end + 1]
+        self.flows_run = max(self.flows_run, end + 1)
+
+        crud_infos = []
+        _collector_locals.crud_infos = crud_infos
+        try:
+            for _, crud_flow in crud_flows:
+                crud_flow()
+        finally:
+            del _collector_locals.crud_infos
+
+        if not crud_infos:
+            return
+        try:
+            log_events(crud_infos)
+        except Exception:
+            logger.exception(
+                f"easy audit had an exception on the creation of {len(crud_infos)} "
+                "CRUDEvents."
+            )
+            if should_propagate_exceptions():
+                raise
+
+
+def _get_collectors():
+    try:
+        return _collector_locals.collectors
+    except AttributeError:
+        _collector_locals.collectors = {}
+        return _collector_locals.collectors
+
+
+def schedule_crud_flow(crud_flow, using):
+    """Run `crud_flow` once the current transaction on `using` commits.
+
+    Inside a transaction the flow is handed to the collector of the transaction,
+    so its event is written together with the other events of that transaction.
+    """
+    if getattr(settings, "TEST", False):
+        crud_flow()
+        return
+
+    connection = transaction.get_connection(using)
+    if not connection.in_atomic_block:
+        transaction.on_commit(crud_flow, using=using)
+        return
+
+    collectors = _get_collectors()
+    collector = collectors.get(using)
+    if collector is None or not collector.is_pending():
+        # The transaction of the previous collector is over, or rolled back.
+        collector = collectors[using] = TransactionCollector(using)
+
+    # Atomic blocks opened with `savepoint=False` add `None` to the savepoint ids:
+    # they can only be rolled back along with their enclosing block.
+    collector.add(crud_flow, frozenset(sid for sid in connection.savepoint_ids if sid))
 
 
 def handle_flow_exception(instance, signal):
@@ -64,25 +300,67 @@ def handle_flow_exception(instance, signal):
         raise
 
 
-def pre_save_crud_flow(instance, object_json_repr, changed_fields):
+def needs_snapshot(instance, object_id):
+    """Tell whether an UPDATE event should store every field of the object.
+
+    The events of the object collected in the current transaction, and not yet
+    written, count as its most recent events.
+    """
+    if not UPDATE_SNAPSHOT_INTERVAL:
+        return True
+    content_type = ContentType.objects.get_for_model(instance)
+    collected = getattr(_collector_locals, "crud_infos", None) or []
+    pending = [
+        crud_info.get("is_snapshot", True)
+        for crud_info in reversed(collected)
+        if crud_info["content_type_id"] == content_type.id
+        and str(crud_info["object_id"]) == str(object_id)
+    ]
+    if any(pending[: UPDATE_SNAPSHOT_INTERVAL - 1]):
+        return False
+    remaining = UPDATE_SNAPSHOT_INTERVAL - 1 - len(pending)
+    if remaining <= 0:
+        return True
+    recent_events = (
+        CRUDEvent.objects.using(DATABASE_ALIAS)
+        .filter(content_type=content_type, object_id=object_id)
+        .order_by("-datetime", "-pk")
+        .values_list("is_snapshot", flat=True)
+    )
+    return not any(recent_events[:remaining])
+
+
+def pre_save_crud_flow(instance, object_id, object_json_repr, changed_fields):
     try:
+        kwargs = {}
+        if not needs_snapshot(instance, object_id):
+            # Keep the serialized values of the changed fields alone.
+            delta = json.loads(changed_fields) or {}
+            data = json.loads(object_json_repr)
+            data[0]["fields"] = {
+                name: value for name, value in data[0]["fields"].items() if name in delta
+            }
+            object_json_repr = json.dumps(data, ensure_ascii=False)
+            kwargs["is_snapshot"] = False
+
         log_event(
             CRUDEvent.UPDATE,
             instance,
-            instance.pk,
+            object_id,
             object_json_repr,
             changed_fields=changed_fields,
+            **kwargs,
         )
     except Exception:
         handle_flow_exception(instance, "pre_save")
 
 
-def post_save_crud_flow(instance, object_json_repr):
+def post_save_crud_flow(instance, object_id, object_json_repr):
     try:
         log_event(
             CRUDEvent.CREATE,
             instance,
-            instance.pk,
+            object_id,
             object_json_repr,
         )
     except Exception:
@@ -109,6 +387,41 @@ def m2m_changed_crud_flow(  # noqa: PLR0913
         handle_flow_exception(instance, "m2m_changed")
 
 
+def bulk_crud_flow(event_type, instances, object_ids, object_json_reprs, **kwargs):
+    """Log an event of `event_type` for each instance, with a single bulk insert.
+
+    The values of `kwargs` are lists holding a value for each instance.
+    """
+    try:
+        user_details = get_current_user_details()
+        crud_infos = [
+            get_crud_info(
+                event_type,
+                instance,
+                object_id,
+                object_json_repr,
+                user_details,
+                **{name: values[index] for name, values in kwargs.items()},
+            )
+            for index, (instance, object_id, object_json_repr) in enumerate(
+                zip(instances, object_ids, object_json_reprs)
+            )
+        ]
+
+        collected = getattr(_collector_locals, "crud_infos", None)
+        if collected is not None:
+            collected.extend(crud_infos)
+            return
+
+        log_events(crud_infos)
+    except Exception:
+        logger.exception(
+            f"easy audit had an exception on the creation of {len(instances)} CRUDEvents."
+        )
+        if should_propagate_exceptions():
+            raise
+
+
 def post_delete_crud_flow(instance, object_id, object_json_repr):
     try:
         log_event(
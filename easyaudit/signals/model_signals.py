@@ -1,11 +1,12 @@
 # ruff: noqa: PLR0913
+import contextlib
 import json
 import logging
 from functools import partial
 
+from asgiref.local import Local
+from django.apps import apps
 from django.conf import settings
-from django.core import serializers
-from django.core.serializers.json import DjangoJSONEncoder
 from django.db import transaction
 from django.db.models import signals
 from django.utils.encoding import force_str
@@ -15,38 +16,71 @@ from easyaudit.models import CRUDEvent
 from easyaudit.settings import (
     CRUD_DIFFERENCE_CALLBACKS,
     REGISTERED_CLASSES,
+    SAVEPOINT_FREE_HANDLERS,
+    TRACK_LOADED_STATE,
     UNREGISTERED_CLASSES,
-    WATCH_MODEL_EVENTS,
 )
-from easyaudit.utils import model_delta, should_propagate_exceptions
+from easyaudit.utils import (
+    encode_instances,
+    get_loaded_instance,
+    instance_to_python,
+    model_delta,
+    record_loaded_state,
+    record_refreshed_state,
+    record_saved_state,
+    serialization_queries,
+    serialize_instance,
+    should_propagate_exceptions,
+)
 
 from .crud_flows import (
     m2m_changed_crud_flow,
     post_delete_crud_flow,
     post_save_crud_flow,
     pre_save_crud_flow,
+    schedule_crud_flow,
 )
 
 logger = logging.getLogger(__name__)
 
 
-def should_audit(instance):
-    """Return True or False to indicate whether the instance should be audited."""
+# Whether to audit the instances of a model, by model class.
+_audit_decisions = {}
+
+# The names of reverse many-to-many accessors, by (model, related model) pair.
+_m2m_rev_field_names = {}
+
+# Per-thread list of the instances deleted within `capture_deletes()`.
+_capture_locals = Local(thread_critical=True)
+
+
+def should_audit_model(model):
+    """Return True or False to indicate whether the model should be audited."""
+    try:
+        return _audit_decisions[model]
+    except KeyError:
+        pass
+
+    decision = True
     # do not audit any model listed in UNREGISTERED_CLASSES
     for unregistered_class in UNREGISTERED_CLASSES:
-        if isinstance(instance, unregistered_class):
-            return False
+        if issubclass(model, unregistered_class):
+            decision = False
+            break
 
     # only audit models listed in REGISTERED_CLASSES (if it's set)
-    if len(REGISTERED_CLASSES) > 0:
-        for registered_class in REGISTERED_CLASSES:
-            if isinstance(instance, registered_class):
-                break
-        else:
-            return False
+    if decision and len(REGISTERED_CLASSES) > 0:
+        decision = any(
+            issubclass(model, registered_class) for registered_class in REGISTERED_CLASSES
+        )
 
-    # all good
-    return True
+    _audit_decisions[model] = decision
+    return decision
+
+
+def should_audit(instance):
+    """Return True or False to indicate whether the instance should be audited."""
+    return should_audit_model(type(instance))
 
 
 def call_callbacks(
@@ -76,6 +110,18 @@ def handle_signal_exception(signal):
         raise
 
 
+def _atomic(using, queries):
+    """Get an atomic block for the work of a receiver.
+
+    The block keeps a failing query of the receiver from breaking the transaction
+    the signal is sent in. With `SAVEPOINT_FREE_HANDLERS`, it is only opened when
+    the work `queries` the database, so as not to create a savepoint for nothing.
+    """
+    if SAVEPOINT_FREE_HANDLERS and not queries:
+        return contextlib.nullcontext()
+    return transaction.atomic(using=using)
+
+
 def pre_save(sender, instance, raw, using, update_fields, **kwargs):
     if raw:
         # Return if loading Fixtures
@@ -85,25 +131,34 @@ def pre_save(sender, instance, raw, using, update_fields, **kwargs):
         if not should_audit(instance):
             return False
 
-        with transaction.atomic(using=using):
+        # Determine if the instance is a create
+        created = instance.pk is None or instance._state.adding
+        old_model = None
+        if not created and TRACK_LOADED_STATE:
+            old_model = get_loaded_instance(instance, using)
+        queries = (
+            bool(CRUD_DIFFERENCE_CALLBACKS)
+            or (not created and old_model is None)
+            or serialization_queries(instance)
+        )
+
+        with _atomic(using, queries):
             try:
-                object_json_repr = serializers.serialize("json", [instance])
+                object_json_repr = serialize_instance(instance)
             except Exception:
                 # We need a better way for this to work. ManyToMany will fail on
                 # pre_save on create
                 return None
 
-            # Determine if the instance is a create
-            created = instance.pk is None or instance._state.adding
-
             # created or updated?
             delta = {}
             if not created:
-                # Use `_base_manager` rather than `objects`/`_default_manager`:
-                # the default manager may filter rows out (soft-delete and
-                # similar patterns), which would raise `DoesNotExist` for a row
-                # that does exist but is currently hidden.
-                old_model = sender._base_manager.get(pk=instance.pk)
+                if old_model is None:
+                    # Use `_base_manager` rather than `objects`/`_default_manager`:
+                    # the default manager may filter rows out (soft-delete and
+                    # similar patterns), which would raise `DoesNotExist` for a row
+                    # that does exist but is currently hidden.
+                    old_model = sender._base_manager.get(pk=instance.pk)
                 delta = model_delta(old_model, instance)
 
                 if not delta and getattr(
@@ -119,23 +174,32 @@ def pre_save(sender, instance, raw, using, update_fields, **kwargs):
             )
 
             # Create crud event only if all callbacks returned True
-            if create_crud_event and not created:
-                crud_flow = partial(
-                    pre_save_crud_flow,
-                    instance=instance,
-                    object_json_repr=object_json_repr,
-                    changed_fields=json.dumps(delta),
-                )
+            if not create_crud_event or created:
+                return None
+
+            crud_flow = partial(
+                pre_save_crud_flow,
+                instance=instance,
+                object_id=instance.pk,
+                object_json_repr=object_json_repr,
+                changed_fields=json.dumps(delta),
+            )
 
-                if getattr(settings, "TEST", False):
-                    crud_flow()
-                else:
-                    transaction.on_commit(crud_flow, using=using)
+        # Scheduled outside of the savepoint above, so that all the events of the
+        # transaction share a single collector.
+        schedule_crud_flow(crud_flow, using=using)
     except Exception:
         handle_signal_exception("pre_save")
 
 
+def post_init(sender, instance, **kwargs):
+    record_loaded_state(instance)
+
+
 def post_save(sender, instance, created, raw, using, update_fields, **kwargs):
+    if TRACK_LOADED_STATE:
+        record_saved_state(instance, using, update_fields)
+
     if raw:
         # Return if loading Fixtures
         return None
@@ -144,8 +208,9 @@ def post_save(sender, instance, created, raw, using, update_fields, **kwargs):
         if not should_audit(instance):
             return False
 
-        with transaction.atomic(using=using):
-            object_json_repr = serializers.serialize("json", [instance])
+        queries = bool(CRUD_DIFFERENCE_CALLBACKS) or serialization_queries(instance)
+        with _atomic(using, queries):
+            object_json_repr = serialize_instance(instance)
 
             # callbacks
             create_crud_event = call_callbacks(
@@ -153,16 +218,17 @@ def post_save(sender, instance, created, raw, using, update_fields, **kwargs):
             )
 
             # Create crud event only if all callbacks returned True
-            if create_crud_event and created:
-                crud_flow = partial(
-                    post_save_crud_flow,
-                    instance=instance,
-                    object_json_repr=object_json_repr,
-                )
-                if getattr(settings, "TEST", False):
-                    crud_flow()
-                else:
-                    transaction.on_commit(crud_flow, using=using)
+            if not create_crud_event or not created:
+                return None
+
+            crud_flow = partial(
+                post_save_crud_flow,
+                instance=instance,
+                object_id=instance.pk,
+                object_json_repr=object_json_repr,
+            )
+
+        schedule_crud_flow(crud_flow, using=using)
     except Exception:
         handle_signal_exception("post_save")
 
@@ -173,13 +239,20 @@ def _m2m_rev_field_name(model1, model2):
     For example, if User has a ManyToManyField connected to Group,
     `_m2m_rev_field_name(Group, User)` retrieves the name of the field on
     Group that lists a group's Users. (By default, this field is called
-    `user_set`, but the name can be overridden).
+    `user_set`, but the name can be overridden). The name is looked up once per
+    pair of models.
     """
+    try:
+        return _m2m_rev_field_names[model1, model2]
+    except KeyError:
+        pass
+
     m2m_field_names = [
         rel.get_accessor_name()
         for rel in model1._meta.get_fields()
         if rel.many_to_many and rel.auto_created and rel.related_model == model2
     ]
+    _m2m_rev_field_names[model1, model2] = m2m_field_names[0]
     return m2m_field_names[0]
 
 
@@ -190,8 +263,10 @@ def m2m_changed(sender, instance, action, reverse, model, pk_set, using, **kwarg
         if action not in ("post_add", "post_remove", "post_clear"):
             return False
 
-        with transaction.atomic(using=using):
-            object_json_repr = serializers.serialize("json", [instance])
+        # Reverse changes read the primary keys of the related objects.
+        queries = reverse or serialization_queries(instance)
+        with _atomic(using, queries):
+            data = instance_to_python(instance)
 
             if reverse:
                 reverse_actions = {
@@ -201,18 +276,17 @@ def m2m_changed(sender, instance, action, reverse, model, pk_set, using, **kwarg
                 }
                 event_type = reverse_actions.get(action, CRUDEvent.M2M_CHANGE_REV)
 
-                # Add reverse M2M changes to event. Must use json lib because
-                # django serializers ignore extra fields.
-                tmp_repr = json.loads(object_json_repr)
-
+                # Add reverse M2M changes to event: django serializers ignore
+                # extra fields.
                 m2m_rev_field = _m2m_rev_field_name(instance._meta.concrete_model, model)
-                related_instances = getattr(instance, m2m_rev_field).all()
-                related_ids = [r.pk for r in related_instances]
+                # Only the primary keys are needed: do not load the related objects.
+                related_ids = list(
+                    getattr(instance, m2m_rev_field).values_list("pk", flat=True)
+                )
 
-                tmp_repr[0]["m2m_rev_model"] = force_str(model._meta)
-                tmp_repr[0]["m2m_rev_pks"] = related_ids
-                tmp_repr[0]["m2m_rev_action"] = action
-                object_json_repr = json.dumps(tmp_repr, cls=DjangoJSONEncoder)
+                data["m2m_rev_model"] = force_str(model._meta)
+                data["m2m_rev_pks"] = related_ids
+                data["m2m_rev_action"] = action
             else:
                 forward_actions = {
                     "post_add": CRUDEvent.M2M_ADD,
@@ -220,6 +294,7 @@ def m2m_changed(sender, instance, action, reverse, model, pk_set, using, **kwarg
                     "post_clear": CRUDEvent.M2M_CLEAR,
                 }
                 event_type = forward_actions.get(action, CRUDEvent.M2M_CHANGE)
+            object_json_repr = encode_instances([data])
 
             crud_flow = partial(
                 m2m_changed_crud_flow,
@@ -230,21 +305,39 @@ def m2m_changed(sender, instance, action, reverse, model, pk_set, using, **kwarg
                 event_type=event_type,
                 object_json_repr=object_json_repr,
             )
-            if getattr(settings, "TEST", False):
-                crud_flow()
-            else:
-                transaction.on_commit(crud_flow, using=using)
+
+        schedule_crud_flow(crud_flow, using=using)
     except Exception:
         handle_signal_exception("m2m-changed")
 
 
+@contextlib.contextmanager
+def capture_deletes():
+    """Collect the audited instances deleted in the block instead of logging them.
+
+    Yields a list that receives an `(instance, pk)` pair for each of them: Django
+    clears the primary keys of the instances once they are all deleted.
+    """
+    previous = getattr(_capture_locals, "deleted", None)
+    _capture_locals.deleted = deleted = []
+    try:
+        yield deleted
+    finally:
+        _capture_locals.deleted = previous
+
+
 def post_delete(sender, instance, using, **kwargs):
     try:
         if not should_audit(instance):
             return False
 
-        with transaction.atomic(using=using):
-            object_json_repr = serializers.serialize("json", [instance])
+        captured = getattr(_capture_locals, "deleted", None)
+        if captured is not None:
+            captured.append((instance, instance.pk))
+            return None
+
+        with _atomic(using, serialization_queries(instance)):
+            object_json_repr = serialize_instance(instance)
             # instance.pk returns None if the changes are performed within a transaction
             object_id = instance.pk
 
@@ -254,19 +347,66 @@ def post_delete(sender, instance, using, **kwargs):
                 object_id=object_id,
                 object_json_repr=object_json_repr,
             )
-            if getattr(settings, "TEST", False):
-                crud_flow()
-            else:
-                transaction.on_commit(
-                    crud_flow,
-                    using=using,
-                )
+
+        schedule_crud_flow(crud_flow, using=using)
     except Exception:
         handle_signal_exception("post-delete")
 
 
-if WATCH_MODEL_EVENTS:
-    signals.post_save.connect(post_save, dispatch_uid="easy_audit_signals_post_save")
-    signals.pre_save.connect(pre_save, dispatch_uid="easy_audit_signals_pre_save")
-    signals.m2m_changed.connect(m2m_changed, dispatch_uid="easy_audit_signals_m2m_changed")
-    signals.post_delete.connect(post_delete, dispatch_uid="easy_audit_signals_post_delete")
+def connect_model(model):
+    """Connect the receivers of the save and delete signals of `model`, if audited."""
+    if not should_audit_model(model):
+        return False
+    signals.post_save.connect(
+        post_save, sender=model, dispatch_uid="easy_audit_signals_post_save"
+    )
+    signals.pre_save.connect(
+        pre_save, sender=model, dispatch_uid="easy_audit_signals_pre_save"
+    )
+    signals.post_delete.connect(
+        post_delete, sender=model, dispatch_uid="easy_audit_signals_post_delete"
+    )
+    if TRACK_LOADED_STATE:
+        track_loaded_state(model)
+    return True
+
+
+def track_loaded_state(model):
+    """Record the field values of the instances of `model` loaded or refreshed."""
+    signals.post_init.connect(
+        post_init, sender=model, dispatch_uid="easy_audit_signals_post_init"
+    )
+    if not getattr(model.refresh_from_db, "records_loaded_state", False):
+        model.refresh_from_db = record_refreshed_state(model.refresh_from_db)
+
+
+def connect_model_signals():
+    """Connect the receivers of the model signals to the audited models only.
+
+    Saving or deleting an instance of any other model, then, does not call them at
+    all. `m2m_changed` is sent by the intermediary model of a many-to-many relation:
+    it is connected for the relations with an audited model on either side.
+    """
+    models = apps.get_models()
+    audited = {model._meta.concrete_model for model in models if connect_model(model)}
+    for model in models:
+        for field in model._meta.local_many_to_many:
+            if (
+                model._meta.concrete_model in audited
+                or field.related_model._meta.concrete_model in audited
+            ):
+                signals.m2m_changed.connect(
+                    m2m_changed,
+                    sender=field.remote_field.through,
+                    dispatch_uid="easy_audit_signals_m2m_changed",
+                )
+
+    # Models created once the app registry is ready.
+    signals.class_prepared.connect(
+        _class_prepared, dispatch_uid="easy_audit_signals_class_prepared"
+    )
+
+
+def _class_prepared(sender, **kwargs):
+    if not sender._meta.abstract:
+        connect_model(sender)
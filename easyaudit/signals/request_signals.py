@@ -1,49 +1,190 @@
+import functools
+import logging
+import random
 import re
+import threading
+import time
+from collections import OrderedDict
 from importlib import import_module
 
+from asgiref.local import Local
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.contrib.auth import SESSION_KEY as AUTH_SESSION_KEY
 from django.contrib.auth import get_user_model
 from django.contrib.sessions.models import Session
-from django.core.signals import request_started
+from django.core.handlers.asgi import ASGIHandler
+from django.core.signals import request_finished, request_started
 from django.http.cookie import SimpleCookie
 from django.utils import timezone
 from django.utils.module_loading import import_string
 
+from easyaudit.backends import EventBuffer
 from easyaudit.settings import (
+    BUFFER_FLUSH_INTERVAL,
+    BUFFER_SIZE,
+    DEFER_REQUEST_EVENTS,
     LOGGING_BACKEND,
     REGISTERED_URLS,
     REMOTE_ADDR_HEADER,
+    REQUEST_EVENTS_FROM_MIDDLEWARE,
+    REQUEST_RATE_LIMITS,
+    REQUEST_SAMPLING,
     UNREGISTERED_URLS,
     WATCH_REQUEST_EVENTS,
 )
 
+logger = logging.getLogger(__name__)
 session_engine = import_module(settings.SESSION_ENGINE)
 audit_logger = import_string(LOGGING_BACKEND)()
 
+# Signals can be sent to coroutine receivers since Django 5.0 (`Signal.asend()`), and
+# sessions can be loaded asynchronously since Django 5.1 (`SessionBase.aload()`).
+ASYNC_REQUEST_STARTED = hasattr(request_started, "asend")
+ASYNC_SESSION_LOAD = hasattr(session_engine.SessionStore, "aload")
+
+
+class _AnyPattern:
+    def __init__(self, patterns):
+        self.patterns = patterns
+
+    def match(self, url):
+        for pattern in self.patterns:
+            match = pattern.match(url)
+            if match:
+                return match
+        return None
+
+
+def compile_url_patterns(patterns):
+    """Compile regular expressions into a single one matching any of them.
+
+    Patterns with groups, or that cannot be combined, are matched one by one instead.
+
+    :return: An object with the `match()` method of compiled regular expressions,
+        or None if there are no patterns.
+    """
+    if not patterns:
+        return None
+    compiled = [re.compile(pattern) for pattern in patterns]
+    if any(pattern.groups for pattern in compiled):
+        # Combining them would renumber the groups their backreferences refer to.
+        return _AnyPattern(compiled)
+    try:
+        return re.compile("|".join(f"(?:{pattern})" for pattern in patterns))
+    except re.error:
+        # Some patterns cannot be combined, e.g. those with global flags.
+        return _AnyPattern(compiled)
+
+
+class URLFilter:
+    """Tell which URLs to log, given the patterns of the URLs to ignore and to log.
+
+    The decisions for the `cache_size` most recently requested URLs are cached.
+    """
+
+    def __init__(self, unregistered_urls, registered_urls, cache_size=1024):
+        self.unregistered = compile_url_patterns(unregistered_urls)
+        self.registered = compile_url_patterns(registered_urls)
+        self.should_log = functools.lru_cache(maxsize=cache_size)(self._should_log)
+
+    def _should_log(self, url):
+        # check if current url is blacklisted
+        if self.unregistered is not None and self.unregistered.match(url):
+            return False
+
+        # only audit URLs listed in REGISTERED_URLS (if it's set)
+        if self.registered is not None:
+            return self.registered.match(url) is not None
+
+        # all good
+        return True
+
+
+url_filter = URLFilter(UNREGISTERED_URLS, REGISTERED_URLS)
+
 
 def should_log_url(url):
-    # check if current url is blacklisted
-    for unregistered_url in UNREGISTERED_URLS:
-        pattern = re.compile(unregistered_url)
+    return url_filter.should_log(url)
+
+
+class RateLimiter:
+    """Token buckets limiting how many requests are logged per client and URL.
+
+    Each bucket holds up to `events` tokens and gets them back over `seconds`. Only
+    the `max_buckets` most recently used buckets are kept, along with the number of
+    requests each skipped since it last let one through.
+    """
+
+    def __init__(self, limits, max_buckets=10000):
+        self.limits = [(re.compile(pattern), limit) for pattern, limit in limits.items()]
+        self.max_buckets = max_buckets
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def allow(self, client, url):
+        """Tell whether to log a request of `client` to `url`.
+
+        :return: 0 to skip the request, else the number of requests it stands for:
+            itself and those skipped since the previous one logged.
+        """
+        limit = next((limit for pattern, limit in self.limits if pattern.match(url)), None)
+        if limit is None:
+            return 1
+
+        events, seconds = limit
+        now = time.monotonic()
+        key = (client, url)
+        with self._lock:
+            tokens, updated, skipped = self._buckets.pop(key, (events, now, 0))
+            tokens = min(events, tokens + (now - updated) * events / seconds)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now, 0)
+                requests = skipped + 1
+            else:
+                self._buckets[key] = (tokens, now, skipped + 1)
+                requests = 0
+            if len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        return requests
+
+
+sampling_patterns = [
+    (re.compile(pattern), rate) for pattern, rate in REQUEST_SAMPLING.items()
+]
+rate_limiter = RateLimiter(REQUEST_RATE_LIMITS)
+
+
+def sample_request(url, client):
+    """Decide whether to log a request, before its session and user are looked up.
+
+    :param url: The path of the request.
+    :param client: What identifies the client of the request for rate limiting.
+    :return: The sample rate to log the request with, or None to skip it. A request
+        let through by a rate limit also stands for the requests it skipped before,
+        which lowers its sample rate accordingly.
+    """
+    sample_rate = 1.0
+    for pattern, rate in sampling_patterns:
         if pattern.match(url):
-            return False
+            sample_rate = rate
+            break
 
-    # only audit URLs listed in REGISTERED_URLS (if it's set)
-    if len(REGISTERED_URLS) > 0:
-        for registered_url in REGISTERED_URLS:
-            pattern = re.compile(registered_url)
-            if pattern.match(url):
-                return True
-        return False
+    if sample_rate < 1 and random.random() >= sample_rate:  # noqa: S311
+        return None
+    requests = rate_limiter.allow(client, url)
+    if not requests:
+        return None
+    return sample_rate / requests
 
-    # all good
-    return True
 
+def get_request_details(environ=None, scope=None):
+    """Get the method, path, query string, remote IP and cookies of a request.
 
-def request_started_handler(sender, **kwargs):
-    environ = kwargs.get("environ")
-    scope = kwargs.get("scope")
+    :param environ: The WSGI environ of the request, if served by WSGI.
+    :param scope: The ASGI scope of the request, if served by ASGI.
+    :rtype: tuple
+    """
     if environ:
         path = environ["PATH_INFO"]
         cookie_string = environ.get("HTTP_COOKIE")
@@ -61,44 +202,263 @@ def request_started_handler(sender, **kwargs):
         remote_ip = next(iter(scope.get("client", ("0.0.0.0", 0))))  # noqa: S104
         query_string = scope.get("query_string")
 
+    return method, path, query_string, remote_ip, cookie_string
+
+
+def get_session_key(cookie_string):
+    if not cookie_string:
+        return None
+    cookie = SimpleCookie()
+    cookie.load(cookie_string)
+    session_cookie_name = settings.SESSION_COOKIE_NAME
+    if session_cookie_name in cookie:
+        return cookie[session_cookie_name].value
+    return None
+
+
+def get_request_info(  # noqa: PLR0913
+    method, path, query_string, remote_ip, user, *, sample_rate=1.0
+):
+    return {
+        "url": path,
+        "method": method,
+        "query_string": query_string,
+        "user_id": getattr(user, "id", None),
+        "remote_ip": remote_ip,
+        "datetime": timezone.now(),
+        "sample_rate": sample_rate,
+    }
+
+
+def write_request_events(request_infos):
+    """Write request events with the logging backend, in bulk if it supports it."""
+    bulk_request = getattr(audit_logger, "bulk_request", None)
+    if bulk_request is not None:
+        bulk_request(request_infos)
+    else:
+        for request_info in request_infos:
+            audit_logger.request(request_info)
+
+
+# Request events waiting to be written once responses have been sent, by any of the
+# requests of the process: from `request_finished` once `BUFFER_SIZE` of them have
+# been collected or `BUFFER_FLUSH_INTERVAL` seconds after the previous write, and
+# when the process exits.
+deferred_request_events = EventBuffer(
+    {"request": write_request_events},
+    BUFFER_SIZE,
+    BUFFER_FLUSH_INTERVAL,
+    flush_after_requests=False,
+)
+
+
+def write_request_event(request_info):
+    if DEFER_REQUEST_EVENTS:
+        deferred_request_events.add("request", request_info)
+    else:
+        audit_logger.request(request_info)
+
+
+async def awrite_request_event(request_info):
+    if DEFER_REQUEST_EVENTS:
+        deferred_request_events.add("request", request_info)
+        return
+    arequest = getattr(audit_logger, "arequest", None)
+    if arequest is not None:
+        await arequest(request_info)
+    else:
+        await sync_to_async(audit_logger.request)(request_info)
+
+
+class PendingRequestEvent:
+    """The event of a request, waiting for the user of the request to be logged.
+
+    `EasyAuditMiddleware` logs it once the authentication middleware has set
+    `request.user`. Under WSGI, the event of a request that never reaches the
+    middleware is logged when the request finishes, with the user of its session.
+    """
+
+    def __init__(self, request_info, session_key):
+        self.request_info = request_info
+        self.session_key = session_key
+        self.logged = False
+
+
+# The key of the pending event in the WSGI environ or the ASGI scope of a request,
+# which the request object is built from.
+PENDING_EVENT_KEY = "easyaudit.request_event"
+
+# The pending event of the current request, for `request_finished`. Receivers of
+# `request_started` sent with `asend()` run in tasks of their own, so this is only
+# set for synchronous handlers.
+_pending_locals = Local()
+
+
+def set_pending_request_event(carrier, pending):
+    carrier[PENDING_EVENT_KEY] = pending
+    _pending_locals.event = pending
+
+
+def take_pending_request_event(request):
+    """Get the event of `request` left to `EasyAuditMiddleware`, if any."""
+    carrier = getattr(request, "scope", None) or getattr(request, "environ", None)
+    pending = carrier.pop(PENDING_EVENT_KEY, None) if carrier else None
+    if pending is None or pending.logged:
+        return None
+    pending.logged = True
+    return pending
+
+
+def log_request_event(request_info, user):
+    request_info["user_id"] = getattr(user, "id", None)
+    write_request_event(request_info)
+
+
+async def alog_request_event(request_info, user):
+    request_info["user_id"] = getattr(user, "id", None)
+    await awrite_request_event(request_info)
+
+
+def get_session_user(session_id):
+    """Get the user logged in the session with the key `session_id`, if any."""
+    if not session_id:
+        return None
+    try:
+        session = session_engine.SessionStore(session_key=session_id).load()
+    except Session.DoesNotExist:
+        session = None
+
+    if session and AUTH_SESSION_KEY in session:
+        user_id = session.get(AUTH_SESSION_KEY)
+        try:
+            return get_user_model().objects.get(id=user_id)
+        except Exception:
+            return None
+    return None
+
+
+async def aget_session_user(session_id):
+    if not session_id:
+        return None
+    session_store = session_engine.SessionStore(session_key=session_id)
+    try:
+        if ASYNC_SESSION_LOAD:
+            session = await session_store.aload()
+        else:
+            session = await sync_to_async(session_store.load)()
+    except Session.DoesNotExist:
+        session = None
+
+    if session and AUTH_SESSION_KEY in session:
+        user_id = session.get(AUTH_SESSION_KEY)
+        try:
+            return await get_user_model().objects.aget(id=user_id)
+        except Exception:
+            return None
+    return None
+
+
+def request_started_handler(sender, **kwargs):
+    if ASYNC_REQUEST_STARTED and sender is ASGIHandler:
+        # Logged by `arequest_started_handler`.
+        return
+
+    if REQUEST_EVENTS_FROM_MIDDLEWARE:
+        # Forget the event of a previous request that did not finish.
+        _pending_locals.event = None
+
+    method, path, query_string, remote_ip, cookie_string = get_request_details(
+        kwargs.get("environ"), kwargs.get("scope")
+    )
+
     if not should_log_url(path):
         return
 
-    user = None
+    # Sampling and rate limiting need no database query: clients are told apart by
+    # their session cookie, or by their IP address if they have none.
+    session_id = get_session_key(cookie_string)
+    sample_rate = sample_request(path, session_id or remote_ip)
+    if sample_rate is None:
+        return
+
+    if REQUEST_EVENTS_FROM_MIDDLEWARE:
+        set_pending_request_event(
+            kwargs.get("environ") or kwargs.get("scope"),
+            PendingRequestEvent(
+                get_request_info(
+                    method, path, query_string, remote_ip, None, sample_rate=sample_rate
+                ),
+                session_id,
+            ),
+        )
+        return
+
     # get the user from cookies
-    if not user and cookie_string:
-        cookie = SimpleCookie()
-        cookie.load(cookie_string)
-        session_cookie_name = settings.SESSION_COOKIE_NAME
-        if session_cookie_name in cookie:
-            session_id = cookie[session_cookie_name].value
-
-            try:
-                session = session_engine.SessionStore(session_key=session_id).load()
-            except Session.DoesNotExist:
-                session = None
-
-            if session and AUTH_SESSION_KEY in session:
-                user_id = session.get(AUTH_SESSION_KEY)
-                try:
-                    user = get_user_model().objects.get(id=user_id)
-                except Exception:
-                    user = None
+    user = get_session_user(session_id)
 
     # may want to wrap this in an atomic transaction later
-    audit_logger.request(
-        {
-            "url": path,
-            "method": method,
-            "query_string": query_string,
-            "user_id": getattr(user, "id", None),
-            "remote_ip": remote_ip,
-            "datetime": timezone.now(),
-        }
+    write_request_event(
+        get_request_info(
+            method, path, query_string, remote_ip, user, sample_rate=sample_rate
+        )
+    )
+
+
+async def arequest_started_handler(sender, **kwargs):
+    """Log requests served by `ASGIHandler` without leaving the event loop.
+
+    The session and the user are loaded, and the event is logged, with the
+    asynchronous APIs of Django and of the logging backend (`arequest()`), if any.
+    """
+    method, path, query_string, remote_ip, cookie_string = get_request_details(
+        scope=kwargs.get("scope")
+    )
+
+    if not should_log_url(path):
+        return
+
+    session_id = get_session_key(cookie_string)
+    sample_rate = sample_request(path, session_id or remote_ip)
+    if sample_rate is None:
+        return
+
+    request_info = get_request_info(
+        method, path, query_string, remote_ip, None, sample_rate=sample_rate
     )
+    if REQUEST_EVENTS_FROM_MIDDLEWARE:
+        set_pending_request_event(
+            kwargs.get("scope"), PendingRequestEvent(request_info, session_id)
+        )
+        return
+
+    await alog_request_event(request_info, await aget_session_user(session_id))
+
+
+def request_finished_handler(sender, **kwargs):
+    pending = getattr(_pending_locals, "event", None)
+    if pending is not None:
+        _pending_locals.event = None
+        if not pending.logged:
+            # The request did not reach `EasyAuditMiddleware`.
+            pending.logged = True
+            log_request_event(pending.request_info, get_session_user(pending.session_key))
+
+    if DEFER_REQUEST_EVENTS:
+        deferred_request_events.flush_if_due()
 
 
 if WATCH_REQUEST_EVENTS:
     request_started.connect(
         request_started_handler, dispatch_uid="easy_audit_signals_request_started"
     )
+    if ASYNC_REQUEST_STARTED:
+        # Connected to `ASGIHandler` alone: any other sender would have to run the
+        # coroutine in an event loop of its own.
+        request_started.connect(
+            arequest_started_handler,
+            sender=ASGIHandler,
+            dispatch_uid="easy_audit_signals_arequest_started",
+        )
+    request_finished.connect(
+        request_finished_handler, dispatch_uid="easy_audit_signals_request_finished"
+    )
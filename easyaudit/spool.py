@@ -0,0 +1,127 @@
+"""Append-only spool of audit events in local segment files.
+
+Each process appends its events as JSON lines to a segment of its own, named
+`easyaudit-<timestamp>-<pid>-<token>.jsonl.open` while it is being written. A
+segment is sealed, i.e. renamed to `*.jsonl`, once it reaches its size or age
+limit and when the process exits. Sealed segments are loaded into the database by
+the `easyaudit_ingest` management command.
+"""
+
+import logging
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from easyaudit.utils import dump_event, load_event
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_SUFFIX = ".jsonl"
+OPEN_SUFFIX = ".open"
+
+
+class SegmentWriter:
+    """Append events to the open segment of the current process.
+
+    Every event is flushed to the operating system as soon as it is appended, so a
+    crashed process only loses the line it was writing; segments are synced to
+    disk when they are sealed.
+    """
+
+    def __init__(self, spool_dir, max_size, max_age):
+        self.spool_dir = Path(spool_dir)
+        self.max_size = max_size
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._file = None
+        self._path = None
+        self._pid = None
+        self._size = 0
+        self._opened_at = 0
+
+    def append(self, kind, info):
+        line = f"{dump_event(kind, info)}\n".encode()
+        with self._lock:
+            if self._pid != os.getpid():
+                # A forked child must not write to, nor seal, its parent's segment.
+                self._file = None
+            if self._file is None:
+                self._open()
+
+            self._file.write(line)
+            self._file.flush()
+            self._size += len(line)
+
+            if (
+                self._size >= self.max_size
+                or time.monotonic() - self._opened_at >= self.max_age
+            ):
+                self._seal()
+
+    def seal(self):
+        """Seal the open segment, if any, making it available for ingestion."""
+        with self._lock:
+            if self._file is not None and self._pid == os.getpid():
+                self._seal()
+
+    def _open(self):
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        # Sorting by name orders the segments by the time they were opened.
+        timestamp = time.time_ns() // 1000
+        name = f"easyaudit-{timestamp:016d}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._path = self.spool_dir / f"{name}{SEGMENT_SUFFIX}{OPEN_SUFFIX}"
+        self._file = open(self._path, "ab")  # noqa: SIM115
+        self._pid = os.getpid()
+        self._size = 0
+        self._opened_at = time.monotonic()
+
+    def _seal(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self._path, self._path.with_suffix(""))
+        self._file = None
+
+
+def sealed_segments(spool_dir):
+    """Return the sealed segments of `spool_dir`, oldest first."""
+    return sorted(Path(spool_dir).glob(f"easyaudit-*{SEGMENT_SUFFIX}"))
+
+
+def seal_orphaned_segments(spool_dir):
+    """Seal the open segments of processes which are no longer running.
+
+    Only supported on POSIX systems, where a process can be probed with signal 0.
+    :return: The sealed segments.
+    :rtype: list
+    """
+    sealed = []
+    for path in Path(spool_dir).glob(f"easyaudit-*{SEGMENT_SUFFIX}{OPEN_SUFFIX}"):
+        pid = int(path.name.split("-")[2])
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            os.replace(path, path.with_suffix(""))
+            sealed.append(path.with_suffix(""))
+        except PermissionError:
+            # Running, under another user.
+            pass
+    return sealed
+
+
+def read_segment(path):
+    """Yield the `(kind, info)` events of a segment.
+
+    Lines which cannot be parsed, such as a last line left incomplete by a crash,
+    are logged and skipped.
+    """
+    with open(path, encoding="utf-8") as f:
+        for lineno, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield load_event(line)
+            except ValueError:
+                logger.warning(f"Skipping unreadable line {lineno} of {path}.")
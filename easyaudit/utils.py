@@ -1,10 +1,18 @@
+import copy
 import datetime as dt
+import functools
+import json
+import zlib
 
 from django.conf import settings
+from django.core import serializers
 from django.core.exceptions import ObjectDoesNotExist
-from django.db.models import NOT_PROVIDED, DateTimeField
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import DEFERRED, NOT_PROVIDED, DateTimeField, Field
 from django.utils import timezone
-from django.utils.encoding import smart_str
+from django.utils.dateparse import parse_datetime
+from django.utils.encoding import is_protected_type, smart_str
 
 
 def get_field_value(obj, field):
@@ -35,6 +43,41 @@ def get_field_value(obj, field):
     return value
 
 
+# The fields compared by `model_delta()`, by model class.
+_delta_fields = {}
+
+
+def _get_delta_fields(model):
+    try:
+        return _delta_fields[model]
+    except KeyError:
+        fields = tuple(
+            (field, field.attname, field.is_relation) for field in model._meta.fields
+        )
+        _delta_fields[model] = fields
+        return fields
+
+
+def _field_delta(old_model, new_model, field, attname, is_relation):
+    """Get the old and new values of a field as strings, or None if unchanged.
+
+    The raw column values are compared first, so that unchanged fields are not
+    converted, and related objects are never loaded: foreign keys are shown by
+    the value of their column.
+    """
+    if getattr(old_model, attname, None) == getattr(new_model, attname, None):
+        return None
+    if is_relation:
+        old_value = field.value_to_string(old_model)
+        new_value = field.value_to_string(new_model)
+    else:
+        old_value = get_field_value(old_model, field)
+        new_value = get_field_value(new_model, field)
+    if old_value == new_value:
+        return None
+    return [smart_str(old_value), smart_str(new_value)]
+
+
 def model_delta(old_model, new_model):
     """Provide delta/difference between two models.
 
@@ -48,12 +91,10 @@ def model_delta(old_model, new_model):
     :rtype: dict
     """
     delta = {}
-    fields = new_model._meta.fields
-    for field in fields:
-        old_value = get_field_value(old_model, field)
-        new_value = get_field_value(new_model, field)
-        if old_value != new_value:
-            delta[field.name] = [smart_str(old_value), smart_str(new_value)]
+    for field, attname, is_relation in _get_delta_fields(type(new_model)):
+        values = _field_delta(old_model, new_model, field, attname, is_relation)
+        if values is not None:
+            delta[field.name] = values
 
     if len(delta) == 0:
         delta = None
@@ -61,10 +102,326 @@ def model_delta(old_model, new_model):
     return delta
 
 
+def model_deltas(old_models, new_models, fields):
+    """Provide the deltas between pairs of model instances, comparing `fields` only.
+
+    The values are compared field by field over all the pairs, in the format of
+    `model_delta()`.
+
+    :param old_models: The old states of the model instances.
+    :param new_models: The new states of the model instances, in the same order.
+    :param fields: The fields to compare.
+    :return: A list with the delta of each pair, None where nothing changed.
+    :rtype: list
+    """
+    deltas = [{} for _ in new_models]
+    for field in fields:
+        attname, is_relation = field.attname, field.is_relation
+        for delta, old_model, new_model in zip(deltas, old_models, new_models):
+            values = _field_delta(old_model, new_model, field, attname, is_relation)
+            if values is not None:
+                delta[field.name] = values
+
+    return [delta or None for delta in deltas]
+
+
+try:
+    from django.db.models import CompositePrimaryKey
+except ImportError:  # Django < 5.2
+    CompositePrimaryKey = None
+
+
+def _get_value_getter(field):
+    """Get a function reading the value of `field` the way Django's serializers do.
+
+    Protected types (None, numbers, dates, decimals) are kept as they are, and any
+    other value is converted to a string.
+    """
+    attname = field.attname
+    if (
+        type(field).value_from_object is Field.value_from_object
+        and type(field).value_to_string is Field.value_to_string
+    ):
+        # What `value_to_string()` does, without reading the value again.
+        def get_value(obj):
+            value = getattr(obj, attname)
+            if type(value) is str or is_protected_type(value):
+                return value
+            return str(value)
+
+        get_value.fast = True
+    else:
+
+        def get_value(obj):
+            value = field.value_from_object(obj)
+            return value if is_protected_type(value) else field.value_to_string(obj)
+
+        get_value.fast = False
+    return get_value
+
+
+class ModelSerializer:
+    """Serialize instances of a model as `serializers.serialize("json", [obj])` does.
+
+    The fields to serialize, and how to read their values, are worked out once, and
+    the JSON encoder is shared by every call.
+    """
+
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+
+    def __init__(self, model):
+        meta = model._meta
+        # As Django's serializers, use the concrete model for proxy models.
+        concrete_meta = meta.concrete_model._meta
+        self.label = str(meta)
+        self.get_pk = _get_value_getter(meta.pk)
+        self.fields = [
+            (field.name, _get_value_getter(field))
+            for field in concrete_meta.local_fields
+            if field.serialize
+        ]
+        self.m2m_fields = [
+            (field.name, _get_value_getter(field.remote_field.model._meta.pk))
+            for field in concrete_meta.local_many_to_many
+            if field.serialize and field.remote_field.through._meta.auto_created
+        ]
+
+    def to_python(self, obj):
+        """Get the dict that `serialize()` encodes in a list."""
+        fields = {name: get_value(obj) for name, get_value in self.fields}
+        for name, get_pk in self.m2m_fields:
+            prefetched = getattr(obj, "_prefetched_objects_cache", {})
+            if name in prefetched:
+                fields[name] = [get_pk(related) for related in prefetched[name]]
+            elif get_pk.fast:
+                related_pks = getattr(obj, name).values_list("pk", flat=True)
+                fields[name] = [
+                    pk if type(pk) is str or is_protected_type(pk) else str(pk)
+                    for pk in related_pks
+                ]
+            else:
+                related_objs = getattr(obj, name).select_related(None).only("pk")
+                fields[name] = [get_pk(related) for related in related_objs]
+        return {"model": self.label, "pk": self.get_pk(obj), "fields": fields}
+
+    def serialize(self, obj):
+        return self.encoder.encode([self.to_python(obj)])
+
+    def queries(self, obj):
+        """Whether `to_python()` queries the database to serialize `obj`."""
+        if not self.m2m_fields or obj.pk is None:
+            # Unsaved instances have no many-to-many values to read.
+            return False
+        prefetched = getattr(obj, "_prefetched_objects_cache", {})
+        return any(name not in prefetched for name, _ in self.m2m_fields)
+
+
+# The serializers of the models, by model class.
+_model_serializers = {}
+
+
+def _get_model_serializer(model):
+    try:
+        return _model_serializers[model]
+    except KeyError:
+        pass
+
+    if CompositePrimaryKey is not None and isinstance(model._meta.pk, CompositePrimaryKey):
+        serializer = None
+    else:
+        serializer = ModelSerializer(model)
+    _model_serializers[model] = serializer
+    return serializer
+
+
+def serialize_instance(instance):
+    """Serialize an instance as `serializers.serialize("json", [instance])` does.
+
+    :rtype: str
+    """
+    serializer = _get_model_serializer(type(instance))
+    if serializer is None:
+        return serializers.serialize("json", [instance])
+    return serializer.serialize(instance)
+
+
+def instance_to_python(instance):
+    """Get the dict that `serialize_instance()` encodes in a list.
+
+    Extra keys may be added to the dict before encoding it with `encode_instances()`.
+
+    :rtype: dict
+    """
+    serializer = _get_model_serializer(type(instance))
+    if serializer is None:
+        return json.loads(serializers.serialize("json", [instance]))[0]
+    return serializer.to_python(instance)
+
+
+def serialization_queries(instance):
+    """Whether serializing an instance queries the database.
+
+    Only the values of many-to-many fields are read from the database, unless they
+    were prefetched.
+
+    :rtype: bool
+    """
+    serializer = _get_model_serializer(type(instance))
+    if serializer is None:
+        return bool(instance._meta.many_to_many)
+    return serializer.queries(instance)
+
+
+def encode_instances(data):
+    """Encode a list of dicts from `instance_to_python()` as `serialize_instance()` does.
+
+    :rtype: str
+    """
+    return ModelSerializer.encoder.encode(data)
+
+
+def serialize_instances(instances):
+    """Serialize each instance as `serializers.serialize("json", [instance])` does.
+
+    :rtype: list
+    """
+    return [serialize_instance(instance) for instance in instances]
+
+
+# The attribute names of the concrete fields of a model, by model class.
+_tracked_attnames = {}
+
+
+def _get_tracked_attnames(model):
+    try:
+        return _tracked_attnames[model]
+    except KeyError:
+        attnames = tuple(field.attname for field in model._meta.concrete_fields)
+        _tracked_attnames[model] = attnames
+        return attnames
+
+
+def record_loaded_state(instance, update_fields=None):
+    """Record the field values of a model instance, as in the database.
+
+    The values are kept in a tuple on the instance. Deferred fields are recorded as
+    `DEFERRED`, and mutable containers (such as the values of JSON fields) are
+    copied, so that changing them in place is noticed.
+
+    :param instance: The model instance, just loaded or saved.
+    :type instance: Model
+    :param update_fields: The names of the fields loaded or saved, if not all of
+        them were.
+    :type update_fields: Iterable
+    """
+    attnames = _get_tracked_attnames(type(instance))
+    previous = instance.__dict__.get("_easyaudit_loaded_state")
+    if update_fields is not None and previous is None:
+        # The other fields may have been given any values.
+        return
+    values = instance.__dict__
+    state = [
+        copy.deepcopy(value) if isinstance(value, (dict, list, set)) else value
+        for value in (values.get(attname, DEFERRED) for attname in attnames)
+    ]
+    if update_fields is not None:
+        # The fields that were not saved still have their previous values.
+        names = set(update_fields)
+        saved = {
+            field.attname
+            for field in instance._meta.concrete_fields
+            if field.name in names or field.attname in names
+        }
+        state = [
+            value if attname in saved else old_value
+            for attname, value, old_value in zip(attnames, state, previous)
+        ]
+    instance._easyaudit_loaded_state = tuple(state)
+
+
+class _SavedStateHook:
+    """Tell whether the transaction of a save committed, once it is called."""
+
+    committed = False
+
+    def __call__(self):
+        self.committed = True
+
+
+def record_saved_state(instance, using, update_fields=None):
+    """Record the field values of a model instance just saved to `using`.
+
+    Inside a transaction, the values are only trusted once it commits: a rollback
+    of the save leaves the database with other values.
+    """
+    record_loaded_state(instance, update_fields)
+    if transaction.get_connection(using).in_atomic_block:
+        hook = instance._easyaudit_commit_hook = _SavedStateHook()
+        transaction.on_commit(hook, using=using)
+    else:
+        instance.__dict__.pop("_easyaudit_commit_hook", None)
+
+
+def record_refreshed_state(refresh_from_db):
+    """Wrap `Model.refresh_from_db()` to record the field values it loads.
+
+    `post_init` is not sent for the instance refreshed, only for the instance its
+    values are copied from.
+    """
+
+    @functools.wraps(refresh_from_db)
+    def wrapper(self, using=None, fields=None, **kwargs):
+        refresh_from_db(self, using=using, fields=fields, **kwargs)
+        record_loaded_state(self, fields)
+        if fields is None:
+            self.__dict__.pop("_easyaudit_commit_hook", None)
+
+    wrapper.records_loaded_state = True
+    return wrapper
+
+
+def _is_rolled_back(hook, using):
+    """Tell whether the transaction `hook` was registered in was rolled back."""
+    if hook.committed:
+        return False
+    connection = transaction.get_connection(using)
+    return not any(func is hook for _, func, _ in connection.run_on_commit)
+
+
+def get_loaded_instance(instance, using):
+    """Get a model instance with the field values recorded by `record_loaded_state`.
+
+    :param instance: The model instance about to be saved.
+    :type instance: Model
+    :param using: The alias of the database it is saved to.
+    :type using: str
+    :return: A new instance of the model, or None if the values in the database
+        are not known for every field.
+    :rtype: Model or None
+    """
+    state = instance.__dict__.get("_easyaudit_loaded_state")
+    hook = instance.__dict__.get("_easyaudit_commit_hook")
+    # Instances neither loaded from nor saved to this database, yet, may have
+    # been given any values.
+    if (
+        state is None
+        or instance._state.db != using
+        or any(value is DEFERRED for value in state)
+        or (hook is not None and _is_rolled_back(hook, using))
+    ):
+        return None
+    model = type(instance)
+    return model.from_db(using, _get_tracked_attnames(model), state)
+
+
+# The names of many-to-many fields, by (model, related model) pair.
+_m2m_field_names = {}
+
+
 def get_m2m_field_name(model, instance):
     """Find M2M field name on instance.
 
-    Called from m2m_changed signal
+    Called from m2m_changed signal. The name is looked up once per pair of models.
     :param model: m2m_changed signal model.
     :type model: Model
     :param instance:m2m_changed signal instance.
@@ -72,10 +429,19 @@ def get_m2m_field_name(model, instance):
     :return: ManyToManyField name of instance related to model.
     :rtype: str
     """
+    key = (model, type(instance))
+    try:
+        return _m2m_field_names[key]
+    except KeyError:
+        pass
+
+    name = None
     for x in model._meta.related_objects:
-        if x.related_model().__class__ == instance.__class__:
-            return x.remote_field.name
-    return None
+        if x.related_model is type(instance):
+            name = x.remote_field.name
+            break
+    _m2m_field_names[key] = name
+    return name
 
 
 def should_propagate_exceptions():
@@ -84,3 +450,77 @@ def should_propagate_exceptions():
     :rtype: bool
     """
     return getattr(settings, "DJANGO_EASY_AUDIT_PROPAGATE_EXCEPTIONS", False)
+
+
+class EventJSONEncoder(DjangoJSONEncoder):
+    """JSON encoder for event dicts that keeps the full precision of datetimes."""
+
+    def default(self, o):
+        if isinstance(o, dt.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def dump_event(kind, info):
+    """Serialize an event dict to a single line of JSON.
+
+    :param kind: The kind of event: "crud", "login" or "request".
+    :type kind: str
+    :param info: The event dict, as handed to the logging backend.
+    :type info: dict
+    :rtype: str
+    """
+    return json.dumps([kind, info], cls=EventJSONEncoder)
+
+
+def load_event(line):
+    """Deserialize an event serialized by `dump_event`.
+
+    :return: A two tuple of the kind of event and the event dict.
+    :rtype: tuple
+    """
+    kind, info = json.loads(line)
+    if info.get("datetime"):
+        info["datetime"] = parse_datetime(info["datetime"])
+    return kind, info
+
+
+def compress_text(text):
+    """Compress a string with zlib.
+
+    :rtype: bytes
+    """
+    return zlib.compress(text.encode("utf-8"))
+
+
+def decompress_text(data):
+    """Decompress the bytes (or memoryview) returned by `compress_text`.
+
+    :rtype: str
+    """
+    return zlib.decompress(data).decode("utf-8")
+
+
+def compress_event_fields(info, fields, min_size):
+    """Move the text of some fields of an event into their compressed counterparts.
+
+    :param info: The event dict.
+    :type info: dict
+    :param fields: A dict of text field names to compressed field names.
+    :type fields: dict
+    :param min_size: Shorter texts are left uncompressed.
+    :type min_size: int
+    :return: A copy of `info`, with the compressed texts replaced by "".
+    :rtype: dict
+    """
+    info = dict(info)
+    for name, compressed_name in fields.items():
+        value = info.get(name)
+        if value is None:
+            continue
+        # Text fields store the string representation of anything else.
+        value = value if isinstance(value, str) else str(value)
+        if len(value) >= min_size:
+            info[compressed_name] = compress_text(value)
+            info[name] = ""
+    return info
@@ -6,6 +6,8 @@ import pytest
 from asgiref.sync import sync_to_async
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
+
     from django.contrib.auth.models import User
     from pytest_django.fixtures import SettingsWrapper
 
@@ -24,6 +26,26 @@ def no_changed_fields_skip(settings: SettingsWrapper) -> SettingsWrapper:
     return settings
 
 
+@pytest.fixture
+def track_loaded_state(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    """Record the field values of the instances of the test models, once loaded."""
+    from django.db.models import signals
+
+    from easyaudit.signals import model_signals
+    from easyaudit.utils import record_refreshed_state
+    from tests.test_app.models import ForeignKeyModel, Model
+
+    monkeypatch.setattr(model_signals, "TRACK_LOADED_STATE", True)
+    for model in (Model, ForeignKeyModel):
+        signals.post_init.connect(model_signals.post_init, sender=model)
+        monkeypatch.setattr(
+            model, "refresh_from_db", record_refreshed_state(model.refresh_from_db)
+        )
+    yield
+    for model in (Model, ForeignKeyModel):
+        signals.post_init.disconnect(model_signals.post_init, sender=model)
+
+
 @pytest.fixture
 def username() -> str:
     return "joe@example.com"
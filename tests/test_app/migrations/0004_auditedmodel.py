@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('test_app', '0003_hidablemodel'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditedModel',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(default='test data', max_length=50)),
+                ('value', models.IntegerField(default=0)),
+                ('test_fk', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='test_app.model')),
+            ],
+        ),
+    ]
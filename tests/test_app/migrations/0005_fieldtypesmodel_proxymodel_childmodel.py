@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('test_app', '0004_auditedmodel'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChildModel',
+            fields=[
+                ('model_ptr', models.OneToOneField(auto_created=True, on_delete=django.db.models.deletion.CASCADE, parent_link=True, primary_key=True, serialize=False, to='test_app.model')),
+                ('extra', models.CharField(blank=True, max_length=50)),
+            ],
+            bases=('test_app.model',),
+        ),
+        migrations.CreateModel(
+            name='ProxyModel',
+            fields=[
+            ],
+            options={
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('test_app.model',),
+        ),
+        migrations.CreateModel(
+            name='FieldTypesModel',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('char', models.CharField(blank=True, max_length=50)),
+                ('text', models.TextField(blank=True)),
+                ('integer', models.IntegerField(null=True)),
+                ('floating', models.FloatField(null=True)),
+                ('decimal', models.DecimalField(decimal_places=3, max_digits=10, null=True)),
+                ('boolean', models.BooleanField(null=True)),
+                ('date', models.DateField(null=True)),
+                ('datetime', models.DateTimeField(null=True)),
+                ('time', models.TimeField(null=True)),
+                ('duration', models.DurationField(null=True)),
+                ('uuid', models.UUIDField(null=True)),
+                ('json', models.JSONField(null=True)),
+                ('binary', models.BinaryField(null=True)),
+                ('ip', models.GenericIPAddressField(null=True)),
+                ('file', models.FileField(blank=True, upload_to='')),
+                ('tags', models.ManyToManyField(blank=True, to='test_app.tag')),
+                ('test_fk', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='test_app.model')),
+            ],
+        ),
+    ]
@@ -2,6 +2,8 @@ import uuid
 
 from django.db import models
 
+from easyaudit.managers import AuditedManager
+
 
 class Model(models.Model):
     id = models.AutoField(primary_key=True)
@@ -75,3 +77,53 @@ class Tag(models.Model):
 class Article(models.Model):
     title = models.CharField(max_length=200)
     tags = models.ManyToManyField(Tag, blank=True)
+
+
+class AuditedModel(models.Model):
+    """Model whose set-based updates and deletions are audited."""
+
+    name = models.CharField(max_length=50, default="test data")
+    value = models.IntegerField(default=0)
+    test_fk = models.ForeignKey(Model, null=True, on_delete=models.SET_NULL)
+
+    objects = AuditedManager()
+
+
+class FieldTypesModel(models.Model):
+    """Model with a field of most types, to compare serializers."""
+
+    char = models.CharField(max_length=50, blank=True)
+    text = models.TextField(blank=True)
+    integer = models.IntegerField(null=True)
+    floating = models.FloatField(null=True)
+    decimal = models.DecimalField(max_digits=10, decimal_places=3, null=True)
+    boolean = models.BooleanField(null=True)
+    date = models.DateField(null=True)
+    datetime = models.DateTimeField(null=True)
+    time = models.TimeField(null=True)
+    duration = models.DurationField(null=True)
+    uuid = models.UUIDField(null=True)
+    json = models.JSONField(null=True)
+    binary = models.BinaryField(null=True)
+    ip = models.GenericIPAddressField(null=True)
+    file = models.FileField(blank=True)
+    test_fk = models.ForeignKey(Model, null=True, on_delete=models.SET_NULL)
+    tags = models.ManyToManyField(Tag, blank=True)
+
+
+class ProxyModel(Model):
+    class Meta:
+        proxy = True
+
+
+class ChildModel(Model):
+    """Model inheriting the fields of `Model`, in a table of its own."""
+
+    extra = models.CharField(max_length=50, blank=True)
+
+
+class Collection(models.Model):
+    """Model related to articles, which have many-to-many fields of their own."""
+
+    name = models.CharField(max_length=50)
+    articles = models.ManyToManyField(Article, blank=True)
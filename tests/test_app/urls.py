@@ -6,6 +6,7 @@ app_name = "test_easyaudit"
 
 urlpatterns = [
     re_path("index", views.index, name="index"),
+    re_path("create-objs", views.create_objs_view, name="create-objs"),
     re_path("create-obj", views.create_obj_view, name="create-obj"),
     re_path("update-obj", views.update_obj_view, name="update-obj"),
     re_path("create-uuid-obj", views.create_uuid_obj_view, name="create-uuid-obj"),
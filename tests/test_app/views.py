@@ -21,6 +21,11 @@ def create_obj_view(request):
     return HttpResponse(obj.id)
 
 
+def create_objs_view(request):
+    objs = [create_obj(Model) for _ in range(int(request.GET["count"]))]
+    return HttpResponse(len(objs))
+
+
 def index(request):
     return HttpResponse()
 
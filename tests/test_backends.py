@@ -0,0 +1,285 @@
+import datetime as dt
+import gc
+import threading
+import time
+import weakref
+
+import pytest
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import request_finished
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from easyaudit.backends import (
+    BufferedModelBackend,
+    CompositeBackend,
+    ModelBackend,
+    QueuedModelBackend,
+    QueuedWriter,
+    RawModelBackend,
+    _open_writers,
+)
+from easyaudit.models import CRUDEvent, LoginEvent, RequestEvent
+
+
+def request_info(url="/"):
+    return {
+        "url": url,
+        "method": "GET",
+        "query_string": "",
+        "user_id": None,
+        "remote_ip": "127.0.0.1",
+        "datetime": timezone.now(),
+    }
+
+
+@pytest.mark.django_db
+class TestBufferedModelBackend:
+    @pytest.fixture
+    def backend(self):
+        backend = BufferedModelBackend(batch_size=3, flush_interval=60)
+        yield backend
+        backend.close()
+
+    def test_events_are_buffered(self, backend):
+        backend.request(request_info())
+        backend.request(request_info())
+
+        assert RequestEvent.objects.count() == 0
+
+    def test_flush_on_batch_size(self, backend):
+        backend.request(request_info())
+        backend.request(request_info())
+        with CaptureQueriesContext(connection) as ctx:
+            backend.request(request_info())
+
+        assert RequestEvent.objects.count() == 3
+        inserts = [q for q in ctx.captured_queries if q["sql"].startswith("INSERT")]
+        assert len(inserts) == 1
+
+    def test_flush_on_interval(self, backend):
+        backend.buffer.flush_interval = 0
+        backend.request(request_info())
+
+        assert RequestEvent.objects.count() == 1
+
+    def test_flush_on_request_finished(self, backend):
+        backend.request(request_info())
+        backend.login({"login_type": LoginEvent.LOGIN, "username": "joe"})
+
+        request_finished.send(sender=self.__class__)
+
+        assert RequestEvent.objects.count() == 1
+        assert LoginEvent.objects.count() == 1
+
+    def test_event_datetime_is_kept(self, backend):
+        info = request_info()
+        info["datetime"] = timezone.now() - dt.timedelta(minutes=5)
+        backend.request(info)
+        backend.flush()
+
+        assert RequestEvent.objects.get().datetime == info["datetime"]
+
+    def test_close(self, backend):
+        backend.request(request_info())
+        backend.close()
+
+        assert RequestEvent.objects.count() == 1
+        assert backend.buffer not in _open_writers
+
+    def test_backends_are_not_kept_alive(self):
+        backend = BufferedModelBackend()
+        buffer = weakref.ref(backend.buffer)
+        del backend
+        gc.collect()
+
+        assert buffer() is None
+
+
+class BlockingBackend:
+    """Backend whose writes wait until `release` is set."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.written = []
+
+    def bulk_request(self, request_infos):
+        self.release.wait(5)
+        self.written.extend(request_infos)
+
+
+class TestQueuedWriter:
+    @pytest.fixture
+    def backend(self):
+        backend = BlockingBackend()
+        yield backend
+        backend.release.set()
+
+    def fill(self, writer, count):
+        for i in range(count):
+            writer.put("request", request_info(f"/{i}"))
+
+    def wait_for_writer(self, writer):
+        # The writer thread holds the first event while the backend blocks.
+        writer.put("request", request_info("/first"))
+        while writer.queue.qsize():
+            time.sleep(0.01)
+
+    @pytest.mark.parametrize(
+        ("full_policy", "expected_urls"),
+        [
+            ("drop_newest", ["/first", "/0", "/1"]),
+            ("drop_oldest", ["/first", "/2", "/3"]),
+        ],
+    )
+    def test_drop_policies(self, backend, full_policy, expected_urls):
+        writer = QueuedWriter(backend, maxsize=2, full_policy=full_policy)
+        self.wait_for_writer(writer)
+        self.fill(writer, 4)
+        backend.release.set()
+        writer.stop()
+
+        assert [info["url"] for info in backend.written] == expected_urls
+        assert writer.dropped == 2
+
+    def test_spill_policy(self, backend, tmp_path):
+        writer = QueuedWriter(
+            backend, maxsize=2, full_policy="spill", spill_dir=tmp_path, poll_interval=0.05
+        )
+        self.wait_for_writer(writer)
+        self.fill(writer, 4)
+
+        with open(writer.spill_path) as spill_file:
+            assert len(spill_file.readlines()) == 2
+
+        backend.release.set()
+        writer.stop()
+
+        urls = [info["url"] for info in backend.written]
+        assert sorted(urls) == ["/0", "/1", "/2", "/3", "/first"]
+        assert isinstance(backend.written[-1]["datetime"], dt.datetime)
+        assert not list(tmp_path.iterdir())
+
+    def test_events_logged_after_stop_are_written(self, backend):
+        backend.release.set()
+        writer = QueuedWriter(backend)
+        writer.stop()
+        writer.put("request", request_info())
+
+        assert len(backend.written) == 1
+
+    def test_unknown_policy(self, backend):
+        with pytest.raises(ImproperlyConfigured):
+            QueuedWriter(backend, full_policy="ignore")
+
+
+@pytest.mark.django_db(transaction=True)
+def test_queued_model_backend():
+    backend = QueuedModelBackend()
+    for _ in range(3):
+        backend.request(request_info())
+    backend.flush()
+    backend.writer.stop()
+
+    assert RequestEvent.objects.count() == 3
+
+
+class FailingBackend:
+    def request(self, request_info):
+        raise RuntimeError
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCompositeBackend:
+    def test_dispatches_to_every_backend(self, caplog):
+        backend = CompositeBackend(
+            ["easyaudit.backends.ModelBackend", "easyaudit.backends.LoggerBackend"]
+        )
+        with caplog.at_level("INFO", logger="easyaudit.events"):
+            backend.request(request_info("/both"))
+            backend.flush()
+
+        assert RequestEvent.objects.get().url == "/both"
+        assert '"/both"' in caplog.records[0].getMessage()
+
+    def test_backends_are_isolated(self):
+        backend = CompositeBackend(
+            [
+                {"BACKEND": "easyaudit.backends.ModelBackend"},
+                {"BACKEND": "easyaudit.backends.ModelBackend", "OPTIONS": {"maxsize": 1}},
+                "easyaudit.backends.ModelBackend",
+            ]
+        )
+        _, stalled, failing = backend.writers
+        stalled.backend = BlockingBackend()
+        failing.backend = FailingBackend()
+        try:
+            for i in range(5):
+                backend.request(request_info(f"/{i}"))
+            backend.writers[0].flush()
+            failing.flush()
+        finally:
+            stalled.backend.release.set()
+            stalled.stop()
+
+        assert RequestEvent.objects.count() == 5
+        assert stalled.dropped > 0
+        assert failing.dropped == 5
+
+    def test_requires_backends(self):
+        with pytest.raises(ImproperlyConfigured):
+            CompositeBackend()
+
+
+@pytest.mark.django_db
+class TestRawModelBackend:
+    def crud_info(self, **kwargs):
+        return {
+            "content_type_id": ContentType.objects.get_for_model(LoginEvent).id,
+            "datetime": timezone.now(),
+            "event_type": CRUDEvent.UPDATE,
+            "object_id": 1,
+            "object_json_repr": "[]",
+            "object_repr": "event",
+            "user_id": None,
+            "user_pk_as_string": "",
+            "changed_fields": {"name": ["a", "b"]},
+            **kwargs,
+        }
+
+    def test_rows_match_model_backend(self):
+        info = self.crud_info()
+        ModelBackend().crud(info)
+        RawModelBackend().crud(info)
+
+        fields = [f.attname for f in CRUDEvent._meta.concrete_fields if not f.primary_key]
+        expected, raw = CRUDEvent.objects.order_by("pk").values(*fields)
+        assert raw == expected
+
+    def test_bulk_insert_is_one_query(self):
+        backend = RawModelBackend()
+        with CaptureQueriesContext(connection) as queries:
+            backend.bulk_request([request_info(f"/{i}") for i in range(5)])
+
+        assert len(queries) == 1
+        assert RequestEvent.objects.count() == 5
+
+    def test_missing_fields_get_their_default(self):
+        info = {"login_type": LoginEvent.LOGIN, "username": "joe"}
+        ModelBackend().login(info)
+        RawModelBackend().login(info)
+
+        expected, raw = LoginEvent.objects.order_by("pk").values("remote_ip", "user_id")
+        assert raw == expected
+        assert LoginEvent.objects.filter(datetime=None).count() == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+class TestModelBackendAsync:
+    async def test_arequest(self):
+        await ModelBackend().arequest(request_info())
+
+        assert await RequestEvent.objects.acount() == 1
@@ -0,0 +1,105 @@
+import errno
+import os
+import socket
+import threading
+import time
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+
+from easyaudit.backends import CollectorBackend
+from easyaudit.collector import Collector
+from easyaudit.models import LoginEvent, RequestEvent
+
+
+def request_info(url="/"):
+    return {
+        "url": url,
+        "method": "GET",
+        "query_string": "",
+        "user_id": None,
+        "remote_ip": "127.0.0.1",
+        "datetime": timezone.now(),
+    }
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return str(tmp_path / "collector.sock")
+
+
+@pytest.fixture
+def backend(socket_path):
+    backend = CollectorBackend(socket_path)
+    yield backend
+    backend.close()
+
+
+def test_requires_a_socket():
+    with pytest.raises(ImproperlyConfigured):
+        CollectorBackend()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_collector_writes_events_in_batches(socket_path, backend):
+    collector = Collector(socket_path, batch_size=100, poll_interval=0.05)
+    thread = threading.Thread(
+        target=collector.serve_forever, kwargs={"poll_interval": 0.05}
+    )
+    thread.start()
+    try:
+        wait_for(lambda: collector._running)
+        backend.bulk_request([request_info(f"/{i}") for i in range(5)])
+        backend.login({"login_type": LoginEvent.LOGIN, "username": "joe"})
+        wait_for(lambda: RequestEvent.objects.count() == 5)
+        wait_for(lambda: LoginEvent.objects.filter(username="joe").exists())
+    finally:
+        collector.shutdown()
+        thread.join()
+
+    assert backend._available
+
+
+@pytest.mark.django_db
+def test_writes_directly_without_collector(backend):
+    backend.request(request_info("/direct"))
+    backend.bulk_request([request_info("/bulk")])
+
+    assert not backend._available
+    assert set(RequestEvent.objects.values_list("url", flat=True)) == {
+        "/direct",
+        "/bulk",
+    }
+
+
+@pytest.mark.django_db
+def test_writes_large_events_directly(backend, monkeypatch):
+    monkeypatch.setattr("easyaudit.backends.MAX_DATAGRAM_SIZE", 10)
+    backend.request(request_info("/large"))
+
+    assert RequestEvent.objects.filter(url="/large").exists()
+    # The event was never sent, so the socket was not found to be unavailable.
+    assert backend._available
+
+
+@pytest.mark.django_db
+def test_writes_events_too_large_for_the_socket_directly(backend, monkeypatch, caplog):
+    class Socket(socket.socket):
+        def sendto(self, *args):
+            raise OSError(errno.EMSGSIZE, os.strerror(errno.EMSGSIZE))
+
+    monkeypatch.setattr(socket, "socket", Socket)
+    backend.request(request_info("/large"))
+
+    assert RequestEvent.objects.filter(url="/large").exists()
+    # The collector may well be running: the event is not a reason to bypass it.
+    assert backend._available
+    assert not caplog.records
@@ -0,0 +1,88 @@
+import json
+
+import pytest
+from django.contrib.contenttypes.models import ContentType
+from django.core import management
+from django.urls import reverse
+from django.utils import timezone
+
+from easyaudit.backends import ModelBackend, RawModelBackend
+from easyaudit.models import CRUDEvent
+
+OBJECT_JSON_REPR = json.dumps(
+    [{"model": "test_app.model", "pk": 1, "fields": {"name": "x" * 500}}]
+)
+
+
+def crud_info(**kwargs):
+    return {
+        "content_type_id": ContentType.objects.get_for_model(CRUDEvent).id,
+        "datetime": timezone.now(),
+        "event_type": CRUDEvent.UPDATE,
+        "object_id": 1,
+        "object_json_repr": OBJECT_JSON_REPR,
+        "object_repr": "event",
+        "changed_fields": json.dumps({"name": ["a", "b"]}),
+        **kwargs,
+    }
+
+
+@pytest.fixture
+def compress(monkeypatch):
+    monkeypatch.setattr("easyaudit.backends.COMPRESS_JSON", True)
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("compress")
+@pytest.mark.parametrize("backend_class", [ModelBackend, RawModelBackend])
+def test_backends_compress(backend_class):
+    backend_class().bulk_crud([crud_info()])
+
+    event = CRUDEvent.objects.get()
+    assert event.object_json_repr == ""
+    assert event.object_json_repr_compressed is not None
+    assert event.get_object_json_repr() == OBJECT_JSON_REPR
+    # Short texts are not worth compressing.
+    assert event.changed_fields_compressed is None
+    assert event.get_changed_fields() == json.dumps({"name": ["a", "b"]})
+
+
+@pytest.mark.django_db
+def test_compress_command(capsys):
+    ModelBackend().crud(crud_info())
+    ModelBackend().crud(crud_info(object_json_repr="short"))
+
+    management.call_command("easyaudit_compress", batch_size=1)
+    management.call_command("easyaudit_compress", min_size=0)
+
+    events = CRUDEvent.objects.order_by("pk")
+    assert [event.get_object_json_repr() for event in events] == [
+        OBJECT_JSON_REPR,
+        "short",
+    ]
+    assert all(event.object_json_repr == "" for event in events)
+    assert capsys.readouterr().out.splitlines() == [
+        "Compressed 1 CRUD events.",
+        # The changed fields of both events, and the short JSON of the second one.
+        "Compressed 2 CRUD events.",
+    ]
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("compress")
+def test_admin_decompresses(admin_client):
+    ModelBackend().crud(crud_info())
+    event = CRUDEvent.objects.get(object_repr="event")
+
+    response = admin_client.get(
+        reverse("admin:easyaudit_crudevent_change", args=[event.pk])
+    )
+    assert "x" * 500 in response.content.decode()
+
+    response = admin_client.post(
+        reverse("admin:easyaudit_crudevent_changelist"),
+        {"action": "export_to_csv", "_selected_action": [event.pk]},
+    )
+    content = response.content.decode()
+    assert "x" * 500 in content
+    assert "Compressed" not in content
@@ -0,0 +1,78 @@
+import json
+
+import pytest
+from django.contrib.contenttypes.models import ContentType
+from django.core import serializers
+from django.db import transaction
+
+from easyaudit.models import CRUDEvent
+from easyaudit.signals import crud_flows
+from tests.test_app.models import ForeignKeyModel, Model
+
+
+@pytest.fixture(autouse=True)
+def snapshot_interval(monkeypatch):
+    monkeypatch.setattr(crud_flows, "UPDATE_SNAPSHOT_INTERVAL", 3)
+
+
+def events_of(obj):
+    return CRUDEvent.objects.filter(
+        content_type=ContentType.objects.get_for_model(obj), object_id=obj.pk
+    ).order_by("datetime", "pk")
+
+
+@pytest.mark.django_db
+def test_snapshots_are_periodic():
+    parent = Model.objects.create()
+    obj = ForeignKeyModel.objects.create(name="0", test_fk=parent)
+    states = [json.loads(serializers.serialize("json", [obj]))]
+    for i in range(1, 5):
+        obj.name = str(i)
+        obj.save()
+        states.append(json.loads(serializers.serialize("json", [obj])))
+
+    events = list(events_of(obj))
+    assert [event.is_snapshot for event in events] == [True, False, False, True, False]
+    assert json.loads(events[1].object_json_repr)[0]["fields"] == {"name": "1"}
+    assert [json.loads(event.get_full_object_json_repr()) for event in events] == states
+
+
+@pytest.mark.django_db
+def test_snapshots_are_periodic_within_a_transaction(
+    settings, django_capture_on_commit_callbacks
+):
+    obj = Model.objects.create(name="0")
+    settings.TEST = False
+    with django_capture_on_commit_callbacks(execute=True), transaction.atomic():
+        for i in range(1, 8):
+            obj.name = str(i)
+            obj.save()
+
+    events = list(events_of(obj))
+    assert [event.is_snapshot for event in events] == [
+        True,
+        False,
+        False,
+        True,
+        False,
+        False,
+        True,
+        False,
+    ]
+    assert json.loads(events[-1].get_full_object_json_repr())[0]["fields"] == {"name": "7"}
+
+
+@pytest.mark.django_db
+def test_update_without_history_is_a_snapshot():
+    obj = Model.objects.create(name="a")
+    events_of(obj).delete()
+    obj.name = "b"
+    obj.save()
+
+    assert events_of(obj).get().is_snapshot
+    obj.name = "c"
+    obj.save()
+
+    delta = events_of(obj).last()
+    assert not delta.is_snapshot
+    assert json.loads(delta.get_full_object_json_repr())[0]["fields"] == {"name": "c"}
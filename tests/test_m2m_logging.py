@@ -1,7 +1,12 @@
+import json
+
 import pytest
+from django.core import serializers
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
 
 from easyaudit.models import CRUDEvent
-from tests.test_app.models import Article, Tag
+from tests.test_app.models import Article, Collection, Tag
 
 
 @pytest.mark.django_db
@@ -24,3 +29,61 @@ def test_m2m_logging_full():
     article.tags.add(tag1, tag2)
     article.tags.clear()
     assert CRUDEvent.objects.filter(event_type=CRUDEvent.M2M_CLEAR).exists()
+
+
+@pytest.mark.django_db
+def test_m2m_reverse_logging():
+    tags = [Tag.objects.create(name=f"tag {i}") for i in range(3)]
+    article = Article.objects.create(title="Test Article")
+    article_table = Article._meta.db_table
+
+    with CaptureQueriesContext(connection) as queries:
+        tags[0].article_set.add(article)
+    article.tags.add(*tags[1:])
+    tags[0].article_set.remove(article)
+
+    # The related articles are read by primary key only.
+    selects = [
+        query["sql"]
+        for query in queries.captured_queries
+        if query["sql"].startswith(f'SELECT "{article_table}".')
+    ]
+    assert selects == [selects[0]]
+    assert selects[0].startswith(f'SELECT "{article_table}"."id" AS "pk" FROM')
+
+    event = CRUDEvent.objects.get(event_type=CRUDEvent.M2M_ADD_REV)
+    assert event.object_id == str(tags[0].pk)
+    data = json.loads(event.object_json_repr)[0]
+    assert data["m2m_rev_model"] == "test_app.article"
+    assert data["m2m_rev_pks"] == [article.pk]
+    assert data["m2m_rev_action"] == "post_add"
+
+    event = CRUDEvent.objects.get(event_type=CRUDEvent.M2M_REMOVE_REV)
+    assert json.loads(event.object_json_repr)[0]["m2m_rev_pks"] == []
+
+
+@pytest.mark.django_db
+def test_m2m_values_in_a_transaction(settings, django_capture_on_commit_callbacks):
+    settings.TEST = False
+    article = Article.objects.create(title="Test Article")
+    tags = [Tag.objects.create(name=f"tag {i}") for i in range(2)]
+    article.tags.add(*tags)
+    collections = [Collection.objects.create(name=f"c {i}") for i in range(2)]
+
+    with django_capture_on_commit_callbacks(execute=True), transaction.atomic():
+        article.collection_set.add(collections[0])
+        # Rows of intermediary models may change without `m2m_changed`.
+        Article.tags.through.objects.filter(tag=tags[1]).delete()
+        article.collection_set.add(collections[1])
+
+    events = CRUDEvent.objects.filter(
+        event_type=CRUDEvent.M2M_ADD_REV, object_id=str(article.pk)
+    ).order_by("id")
+    reprs = [json.loads(event.object_json_repr)[0] for event in events]
+    assert [data["fields"]["tags"] for data in reprs] == [
+        [tags[0].pk, tags[1].pk],
+        [tags[0].pk],
+    ]
+    assert reprs[-1]["m2m_rev_pks"] == [collection.pk for collection in collections]
+    expected = json.loads(serializers.serialize("json", [article]))[0]
+    assert {key: reprs[-1][key] for key in expected} == expected
@@ -1,17 +1,27 @@
 import json
 import logging
+import re
+from types import SimpleNamespace
 
 import pytest
 from asgiref.sync import sync_to_async
 from django.contrib.contenttypes.models import ContentType
+from django.contrib.sessions.models import Session
 from django.core import management
-from django.db import transaction
+from django.core.handlers.asgi import ASGIHandler
+from django.core.signals import request_started
+from django.db import connection, transaction
+from django.db.models import signals
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils.version import get_version
 from pytest_django.asserts import assertInHTML
 
+from easyaudit.admin import CRUDEventAdmin
+from easyaudit.backends import EventBuffer
 from easyaudit.middleware.easyaudit import clear_request, set_current_user
 from easyaudit.models import CRUDEvent, RequestEvent
+from easyaudit.signals import crud_flows, model_signals, request_signals
 from tests.test_app.models import (
     BigIntForeignKeyModel,
     BigIntM2MModel,
@@ -40,6 +50,16 @@ def test_no_issues(capsys: pytest.CaptureFixture):
     assert "System check identified no issues" in captured
 
 
+def test_signals_are_connected_to_audited_models_only():
+    assert signals.pre_save.has_listeners(Model)
+    assert signals.post_delete.has_listeners(Model)
+    assert signals.m2m_changed.has_listeners(M2MModel.test_m2m.through)
+    assert not signals.pre_save.has_listeners(Session)
+    assert not signals.post_save.has_listeners(CRUDEvent)
+    assert model_signals.should_audit(Model())
+    assert not model_signals.should_audit(Session())
+
+
 @pytest.mark.parametrize(
     "model",
     [
@@ -104,6 +124,27 @@ class TestAuditModels:
         data = json.loads(crud_event.object_json_repr)[0]
         assert str(data["fields"]["test_fk"]) == str(obj.id)
 
+    def test_fk_model_update(self, model, fk_model):
+        first, second = model.objects.create(), model.objects.create()
+        obj_fk = fk_model.objects.create(name="test", test_fk=first)
+        obj_fk = fk_model.objects.get(pk=obj_fk.pk)
+        obj_fk.test_fk_id = second.id
+
+        # The related objects are not loaded to compare the foreign keys.
+        with CaptureQueriesContext(connection) as queries:
+            obj_fk.save()
+        related_table = f'FROM "{model._meta.db_table}"'
+        assert not any(related_table in query["sql"] for query in queries)
+
+        crud_event = CRUDEvent.objects.filter(
+            object_id=obj_fk.id,
+            content_type=ContentType.objects.get_for_model(obj_fk),
+            event_type=CRUDEvent.UPDATE,
+        ).get()
+        assert json.loads(crud_event.changed_fields) == {
+            "test_fk": [str(first.id), str(second.id)]
+        }
+
     def test_m2m_model(self, model, m2m_model):
         obj = model.objects.create()
         obj_m2m = m2m_model(name="test")
@@ -303,6 +344,43 @@ class TestMiddleware:
         crud_event = crud_event_qs.first()
         assert crud_event.user is None
 
+    def test_user_checked_once_per_request(self, user, client):
+        client.force_login(user)
+        user_table = f'FROM "{user._meta.db_table}"'
+
+        def user_queries(count):
+            with CaptureQueriesContext(connection) as queries:
+                client.post(reverse("test_app:create-objs") + f"?count={count}")
+            return [query for query in queries if user_table in query["sql"]]
+
+        # The users of the request event and of the authentication middleware, and
+        # the check.
+        assert len(user_queries(1)) == len(user_queries(5)) == 3
+        assert CRUDEvent.objects.filter(user=user).count() == 6
+
+    def test_user_checked_once_outside_requests(self, user, monkeypatch):
+        monkeypatch.setattr(crud_flows, "_user_details_cache", {})
+        clear_request()
+        set_current_user(user)
+        user_table = f'FROM "{user._meta.db_table}"'
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                Model.objects.create()
+                Model.objects.create()
+            assert len([query for query in queries if user_table in query["sql"]]) == 1
+
+            # Deleting the user, wherever it is deleted, drops it from the cache.
+            pk = str(user.pk)
+            type(user).objects.filter(pk=user.pk).delete()
+            Model.objects.create()
+        finally:
+            clear_request()
+
+        events = CRUDEvent.objects.filter(
+            content_type=ContentType.objects.get_for_model(Model)
+        ).order_by("pk")
+        assert [event.user_pk_as_string for event in events] == [pk, pk, ""]
+
     def test_middleware_logged_in_user_in_request(self, user, client):
         client.force_login(user)
         create_obj_url = reverse("test_app:create-obj")
@@ -329,6 +407,16 @@ class TestASGIRequestEvent:
         qs = RequestEvent.objects.filter(user=async_user)
         assert await qs.aexists()
 
+    async def test_middleware_mode(self, async_user, async_client, monkeypatch):
+        monkeypatch.setattr(request_signals, "REQUEST_EVENTS_FROM_MIDDLEWARE", True)
+        await async_client.aforce_login(async_user)
+
+        resp = await async_client.get(reverse("test_app:index"))
+        assert resp.status_code == 200
+
+        event = await RequestEvent.objects.select_related("user").aget()
+        assert event.user == async_user
+
     async def test_remote_addr_default(self, async_client):
         assert await RequestEvent.objects.acount() == 0
 
@@ -391,6 +479,162 @@ class TestWSGIRequestEvent:
 
         assert RequestEvent.objects.get(user=user)
 
+    def test_sampling(self, client, monkeypatch):
+        monkeypatch.setattr(
+            request_signals, "sampling_patterns", [(re.compile("^/test_app/"), 0.25)]
+        )
+        monkeypatch.setattr(request_signals.random, "random", lambda: 0.5)
+        client.get(reverse("test_app:index"))
+        assert not RequestEvent.objects.exists()
+
+        monkeypatch.setattr(request_signals.random, "random", lambda: 0.1)
+        client.get(reverse("test_app:index"))
+        assert RequestEvent.objects.get().sample_rate == 0.25
+
+    def test_rate_limit(self, client, monkeypatch):
+        monkeypatch.setattr(
+            request_signals,
+            "rate_limiter",
+            request_signals.RateLimiter({"^/test_app/": (2, 3600)}),
+        )
+        for _ in range(3):
+            client.get(reverse("test_app:index"))
+        client.get(reverse("test_app:index"), REMOTE_ADDR="10.0.0.2")
+
+        assert RequestEvent.objects.filter(remote_ip="127.0.0.1").count() == 2
+        assert RequestEvent.objects.filter(remote_ip="10.0.0.2").count() == 1
+        assert RequestEvent.objects.get(remote_ip="10.0.0.2").sample_rate == 1.0
+
+    def test_rate_limited_sample_rate(self, client, monkeypatch):
+        now = [0.0]
+        monkeypatch.setattr(
+            request_signals, "time", SimpleNamespace(monotonic=lambda: now[0])
+        )
+        monkeypatch.setattr(
+            request_signals,
+            "rate_limiter",
+            request_signals.RateLimiter({"^/test_app/": (1, 60)}),
+        )
+        for _ in range(4):
+            client.get(reverse("test_app:index"))
+        now[0] = 60.0
+        client.get(reverse("test_app:index"))
+
+        # The second event stands for itself and the 3 requests skipped before it.
+        events = RequestEvent.objects.order_by("pk")
+        assert [event.sample_rate for event in events] == [1.0, 0.25]
+        assert sum(1 / event.sample_rate for event in events) == 5
+
+    def test_middleware_mode(self, user, client, monkeypatch):
+        client.force_login(user)
+        tables = [f'FROM "{model._meta.db_table}"' for model in (Session, type(user))]
+
+        def session_and_user_queries():
+            with CaptureQueriesContext(connection) as queries:
+                client.post(reverse("test_app:create-obj"))
+            return [
+                query for query in queries if any(table in query["sql"] for table in tables)
+            ]
+
+        queries = len(session_and_user_queries())
+        monkeypatch.setattr(request_signals, "REQUEST_EVENTS_FROM_MIDDLEWARE", True)
+        # The session and the user are loaded once, by the authentication middleware.
+        assert len(session_and_user_queries()) == queries - 2
+
+        assert RequestEvent.objects.filter(user=user).count() == 2
+
+    @pytest.fixture
+    def deferred(self, monkeypatch):
+        deferred = EventBuffer(
+            {"request": request_signals.write_request_events},
+            batch_size=3,
+            flush_interval=3600,
+            flush_after_requests=False,
+        )
+        monkeypatch.setattr(request_signals, "DEFER_REQUEST_EVENTS", True)
+        monkeypatch.setattr(request_signals, "deferred_request_events", deferred)
+        yield deferred
+        deferred.close()
+
+    def test_deferred_writes(self, client, deferred):
+
+        for _ in range(2):
+            client.get(reverse("test_app:index"))
+        assert not RequestEvent.objects.exists()
+
+        # Written in one batch, after the response of the third request.
+        with CaptureQueriesContext(connection) as queries:
+            client.get(reverse("test_app:index"))
+        table = f'INSERT INTO "{RequestEvent._meta.db_table}"'
+        assert len([query for query in queries if table in query["sql"]]) == 1
+        assert RequestEvent.objects.count() == 3
+
+        client.get(reverse("test_app:index"))
+        deferred.flush()
+        assert RequestEvent.objects.count() == 4
+
+    def test_deferred_write_errors(self, client, deferred, monkeypatch, settings):
+        def fail(request_infos):
+            raise RuntimeError
+
+        monkeypatch.setattr(request_signals.audit_logger, "bulk_request", fail)
+        settings.DJANGO_EASY_AUDIT_PROPAGATE_EXCEPTIONS = False
+        client.get(reverse("test_app:index"))
+        deferred.flush()
+
+        settings.DJANGO_EASY_AUDIT_PROPAGATE_EXCEPTIONS = True
+        client.get(reverse("test_app:index"))
+        with pytest.raises(RuntimeError):
+            deferred.flush()
+
+    def test_middleware_mode_without_middleware(self, user, client, monkeypatch, settings):
+        monkeypatch.setattr(request_signals, "REQUEST_EVENTS_FROM_MIDDLEWARE", True)
+        settings.MIDDLEWARE = [
+            path for path in settings.MIDDLEWARE if "EasyAuditMiddleware" not in path
+        ]
+        client.force_login(user)
+        client.get(reverse("test_app:index"))
+
+        # Logged when the request finishes, with the user of the session.
+        assert RequestEvent.objects.get().user == user
+
+
+class TestURLFilter:
+    def test_unregistered_urls(self):
+        url_filter = request_signals.URLFilter([r"^/admin/", r"^/static/"], [])
+
+        assert not url_filter.should_log("/admin/")
+        assert not url_filter.should_log("/static/app.css")
+        assert url_filter.should_log("/api/admin/")
+
+    def test_registered_urls(self):
+        url_filter = request_signals.URLFilter([r"^/api/private/"], [r"^/api/"])
+
+        assert url_filter.should_log("/api/items")
+        assert not url_filter.should_log("/api/private/items")
+        assert not url_filter.should_log("/items")
+
+    def test_patterns_with_global_flags(self):
+        url_filter = request_signals.URLFilter([r"^/admin/", r"(?i)^/STATIC/"], [])
+
+        assert not url_filter.should_log("/static/app.css")
+        assert url_filter.should_log("/")
+
+    def test_patterns_with_groups(self):
+        # The backreference of the second pattern refers to its own group.
+        url_filter = request_signals.URLFilter([r"^/(admin)/", r"^/(\w+)/\1/"], [])
+
+        assert not url_filter.should_log("/admin/")
+        assert not url_filter.should_log("/api/api/")
+        assert url_filter.should_log("/api/items/")
+
+    def test_decisions_are_cached(self):
+        url_filter = request_signals.URLFilter([r"^/admin/"], [], cache_size=1)
+        url_filter.should_log("/")
+        url_filter.should_log("/")
+
+        assert url_filter.should_log.cache_info().hits == 1
+
 
 @pytest.mark.django_db
 class TestAuditAdmin:
@@ -410,3 +654,61 @@ class TestAuditAdmin:
                 f"</{tag_name}>",
                 decoded_content,
             )
+
+    @pytest.mark.parametrize("readonly", [False, True])
+    def test_crud_event_change_form(self, admin_client, monkeypatch, readonly):
+        monkeypatch.setattr("easyaudit.admin_helpers.READONLY_EVENTS", readonly)
+        obj = Model.objects.create(name="shown")
+        event = CRUDEvent.objects.get(
+            content_type=ContentType.objects.get_for_model(obj), object_id=obj.pk
+        )
+
+        response = admin_client.get(
+            reverse("admin:easyaudit_crudevent_change", args=(event.pk,))
+        )
+
+        assert response.status_code == 200
+        fields = response.context["adminform"].form.fields
+        readonly_fields = response.context["adminform"].readonly_fields
+        for name in CRUDEventAdmin.exclude:
+            assert name not in fields
+            assert name not in readonly_fields
+        assert "object_json_repr_prettified" in readonly_fields
+        assert "shown" in response.content.decode()
+
+
+@pytest.mark.skipif(
+    not request_signals.ASYNC_REQUEST_STARTED, reason="requires Signal.asend()"
+)
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+class TestAsyncRequestStarted:
+    @pytest.fixture
+    def scope(self):
+        return {
+            "type": "http",
+            "method": "GET",
+            "path": "/test_app/index",
+            "query_string": b"",
+            "headers": [],
+            "client": ("10.0.0.1", 111),
+        }
+
+    async def test_request_event_is_logged_once(self, scope):
+        await request_started.asend(sender=ASGIHandler, scope=scope)
+
+        event = await RequestEvent.objects.aget()
+        assert event.url == "/test_app/index"
+        assert event.remote_ip == "10.0.0.1"
+
+    async def test_backend_async_method_is_used(self, scope, monkeypatch):
+        calls = []
+
+        async def arequest(request_info):
+            calls.append(request_info)
+
+        monkeypatch.setattr(request_signals.audit_logger, "arequest", arequest)
+        await request_started.asend(sender=ASGIHandler, scope=scope)
+
+        assert [call["url"] for call in calls] == ["/test_app/index"]
+        assert not await RequestEvent.objects.aexists()
@@ -0,0 +1,207 @@
+import json
+
+import pytest
+from django.contrib.contenttypes.models import ContentType
+from django.core import serializers
+from django.db import connection
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext
+
+from easyaudit.models import CRUDEvent
+from tests.test_app.models import AuditedModel, Model
+
+
+def events_of(event_type):
+    return CRUDEvent.objects.filter(
+        content_type=ContentType.objects.get_for_model(AuditedModel),
+        event_type=event_type,
+    ).order_by("object_id")
+
+
+def event_inserts(queries):
+    table = CRUDEvent._meta.db_table
+    return [query for query in queries if query["sql"].startswith(f'INSERT INTO "{table}"')]
+
+
+@pytest.fixture
+def objs():
+    return [AuditedModel.objects.create(name=f"obj {i}", value=i) for i in range(3)]
+
+
+@pytest.mark.django_db
+def test_update(objs):
+    ContentType.objects.get_for_model(AuditedModel)
+    with CaptureQueriesContext(connection) as queries:
+        rows = AuditedModel.objects.filter(value__gte=1).update(value=F("value") + 10)
+
+    assert rows == 2
+    table = AuditedModel._meta.db_table
+    statements = [
+        query for query in queries.captured_queries if f'"{table}"' in query["sql"]
+    ]
+    # The rows before, the update and the rows after.
+    assert len(statements) == 3
+    assert len(event_inserts(queries.captured_queries)) == 1
+
+    events = list(events_of(CRUDEvent.UPDATE))
+    assert [event.object_id for event in events] == [str(obj.pk) for obj in objs[1:]]
+    for event, obj in zip(events, objs[1:]):
+        obj.refresh_from_db()
+        assert event.object_json_repr == serializers.serialize("json", [obj])
+        assert json.loads(event.changed_fields) == {
+            "value": [str(obj.value - 10), str(obj.value)]
+        }
+        assert event.object_repr == str(obj)
+
+
+@pytest.mark.django_db
+def test_update_of_the_rows_read(objs):
+    table = AuditedModel._meta.db_table
+    inserted = []
+
+    def insert_before_update(execute, sql, params, many, context):
+        if not inserted and sql.startswith(f'UPDATE "{table}"'):
+            # A matching row, committed by another transaction after the read.
+            inserted.append(AuditedModel.objects.bulk_create([AuditedModel(value=5)])[0])
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(insert_before_update):
+        rows = AuditedModel.objects.filter(value__gte=1).update(value=0)
+
+    assert rows == 2
+    inserted[0].refresh_from_db()
+    assert inserted[0].value == 5
+    events = list(events_of(CRUDEvent.UPDATE))
+    assert [event.object_id for event in events] == [str(obj.pk) for obj in objs[1:]]
+
+
+@pytest.mark.django_db
+def test_update_in_batches(objs, monkeypatch):
+    monkeypatch.setattr(connection.ops, "bulk_batch_size", lambda fields, objs: 2)
+    table = AuditedModel._meta.db_table
+    with CaptureQueriesContext(connection) as queries:
+        rows = AuditedModel.objects.update(value=F("value") + 10)
+
+    assert rows == 3
+    updates = [
+        query
+        for query in queries.captured_queries
+        if query["sql"].startswith(f'UPDATE "{table}"')
+    ]
+    assert len(updates) == 2
+    events = list(events_of(CRUDEvent.UPDATE))
+    assert [event.object_id for event in events] == [str(obj.pk) for obj in objs]
+    assert [json.loads(event.changed_fields) for event in events] == [
+        {"value": [str(obj.value), str(obj.value + 10)]} for obj in objs
+    ]
+
+
+@pytest.mark.django_db
+def test_update_foreign_key(objs):
+    parent = Model.objects.create(name="parent")
+    AuditedModel.objects.filter(pk=objs[0].pk).update(test_fk=parent)
+
+    event = events_of(CRUDEvent.UPDATE).get()
+    assert json.loads(event.changed_fields) == {"test_fk": ["None", str(parent.pk)]}
+
+
+@pytest.mark.django_db
+def test_update_without_changes(objs, no_changed_fields_skip):
+    AuditedModel.objects.update(value=1)
+
+    events = list(events_of(CRUDEvent.UPDATE))
+    assert [event.object_id for event in events] == [str(objs[0].pk), str(objs[2].pk)]
+
+
+@pytest.mark.django_db
+def test_update_of_no_rows(objs):
+    assert AuditedModel.objects.filter(value__gt=10).update(value=0) == 0
+    assert not events_of(CRUDEvent.UPDATE).exists()
+
+
+@pytest.mark.django_db
+def test_delete(objs):
+    expected = [serializers.serialize("json", [obj]) for obj in objs[:2]]
+    ContentType.objects.get_for_model(AuditedModel)
+    with CaptureQueriesContext(connection) as queries:
+        deleted, _ = AuditedModel.objects.filter(value__lt=2).delete()
+
+    assert deleted == 2
+    assert len(event_inserts(queries.captured_queries)) == 1
+
+    events = list(events_of(CRUDEvent.DELETE))
+    assert [event.object_id for event in events] == [str(obj.pk) for obj in objs[:2]]
+    assert [event.object_json_repr for event in events] == expected
+
+
+@pytest.mark.django_db
+def test_delete_of_instance(objs):
+    pk = objs[0].pk
+    objs[0].delete()
+
+    event = events_of(CRUDEvent.DELETE).get()
+    assert event.object_id == str(pk)
+
+
+@pytest.mark.django_db
+def test_bulk_create():
+    ContentType.objects.get_for_model(AuditedModel)
+    with CaptureQueriesContext(connection) as queries:
+        objs = AuditedModel.objects.bulk_create(
+            [AuditedModel(name=f"obj {i}") for i in range(3)]
+        )
+
+    assert len(event_inserts(queries.captured_queries)) == 1
+    events = list(events_of(CRUDEvent.CREATE))
+    assert [event.object_id for event in events] == [str(obj.pk) for obj in objs]
+    assert [event.object_json_repr for event in events] == [
+        serializers.serialize("json", [obj]) for obj in objs
+    ]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "conflicts",
+    [
+        {"ignore_conflicts": True},
+        {"update_conflicts": True, "update_fields": ["name"], "unique_fields": ["id"]},
+    ],
+    ids=["ignore", "update"],
+)
+def test_bulk_create_with_conflicts(objs, conflicts):
+    AuditedModel.objects.bulk_create(
+        [AuditedModel(pk=objs[0].pk, name="conflicting"), AuditedModel(name="new")],
+        **conflicts,
+    )
+
+    assert AuditedModel.objects.count() == 4
+    # Only the events of `objs`, which were created one by one.
+    assert events_of(CRUDEvent.CREATE).count() == 3
+    assert not events_of(CRUDEvent.UPDATE).exists()
+
+
+@pytest.mark.django_db
+def test_bulk_update(objs):
+    for obj in objs[:2]:
+        obj.name = f"renamed {obj.pk}"
+    ContentType.objects.get_for_model(AuditedModel)
+    with CaptureQueriesContext(connection) as queries:
+        rows = AuditedModel.objects.bulk_update(objs, ["name"])
+
+    assert rows == 3
+    table = AuditedModel._meta.db_table
+    statements = [
+        query for query in queries.captured_queries if f'"{table}"' in query["sql"]
+    ]
+    # The rows before, and the update.
+    assert len(statements) == 2
+    assert len(event_inserts(queries.captured_queries)) == 1
+
+    events = list(events_of(CRUDEvent.UPDATE))
+    assert [event.object_id for event in events] == [str(obj.pk) for obj in objs]
+    assert [json.loads(event.changed_fields) for event in events] == [
+        {"name": ["obj 0", f"renamed {objs[0].pk}"]},
+        {"name": ["obj 1", f"renamed {objs[1].pk}"]},
+        None,
+    ]
+    assert events[0].object_json_repr == serializers.serialize("json", [objs[0]])
@@ -0,0 +1,100 @@
+"""Savepoints created by the receivers of the model signals.
+
+Tests run inside a transaction, so every atomic block of a receiver creates a
+savepoint. With `SAVEPOINT_FREE_HANDLERS`, only the receivers that query the
+database create one.
+"""
+
+import pytest
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from easyaudit.models import CRUDEvent
+from easyaudit.signals import model_signals
+from tests.test_app.models import Article, Model, Tag
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(params=[False, True], ids=["atomic", "savepoint_free"])
+def savepoint_free(request, monkeypatch):
+    monkeypatch.setattr(model_signals, "SAVEPOINT_FREE_HANDLERS", request.param)
+    # Looked up once, so that the queries counted are those of the operations.
+    for model in (Model, Article, Tag):
+        ContentType.objects.get_for_model(model)
+    return request.param
+
+
+@pytest.fixture
+def savepoints(django_capture_on_commit_callbacks):
+    @override_settings(TEST=False)
+    def count(operation):
+        """Run `operation` and count the savepoints it creates.
+
+        Its events are written afterwards, as when its transaction commits.
+        """
+        on_commit = django_capture_on_commit_callbacks(execute=True)
+        with on_commit, CaptureQueriesContext(connection) as queries:
+            operation()
+        return sum(query["sql"].startswith("SAVEPOINT") for query in queries)
+
+    return count
+
+
+def test_create(savepoint_free, savepoints):
+    assert savepoints(lambda: Model.objects.create(name="created")) == (
+        0 if savepoint_free else 2
+    )
+    assert CRUDEvent.objects.filter(event_type=CRUDEvent.CREATE).exists()
+
+
+def test_update(savepoint_free, savepoints):
+    obj = Model.objects.create()
+    obj.name = "updated"
+
+    # The row is selected before the update, within a savepoint.
+    assert savepoints(obj.save) == (1 if savepoint_free else 2)
+    assert CRUDEvent.objects.filter(event_type=CRUDEvent.UPDATE).exists()
+
+
+@pytest.mark.usefixtures("track_loaded_state")
+def test_update_of_tracked_state(savepoint_free, savepoints):
+    obj = Model.objects.create()
+    obj.name = "updated"
+
+    assert savepoints(obj.save) == (0 if savepoint_free else 2)
+    assert CRUDEvent.objects.filter(event_type=CRUDEvent.UPDATE).exists()
+
+
+def test_delete(savepoint_free, savepoints):
+    obj = Model.objects.create()
+
+    assert savepoints(obj.delete) == (0 if savepoint_free else 1)
+    assert CRUDEvent.objects.filter(event_type=CRUDEvent.DELETE).exists()
+
+
+def test_create_with_many_to_many(savepoint_free, savepoints):
+    # The many-to-many values are read after the instance is saved.
+    assert savepoints(lambda: Article.objects.create(title="created")) == (
+        1 if savepoint_free else 2
+    )
+
+
+def test_many_to_many_changes(savepoint_free, savepoints):
+    article = Article.objects.create(title="article")
+    tag = Tag.objects.create(name="tag")
+
+    assert savepoints(lambda: article.tags.add(tag)) == 1
+    assert savepoints(lambda: tag.article_set.remove(article)) == 1
+    assert CRUDEvent.objects.filter(event_type=CRUDEvent.M2M_ADD).exists()
+    assert CRUDEvent.objects.filter(event_type=CRUDEvent.M2M_REMOVE_REV).exists()
+
+
+def test_callbacks_run_within_a_savepoint(savepoint_free, savepoints, monkeypatch):
+    monkeypatch.setattr(
+        model_signals, "CRUD_DIFFERENCE_CALLBACKS", [lambda *args, **kwargs: True]
+    )
+
+    assert savepoints(lambda: Model.objects.create(name="created")) == 2
@@ -0,0 +1,87 @@
+import datetime as dt
+import uuid
+from decimal import Decimal
+
+import pytest
+from django.core import serializers
+from django.utils import timezone
+
+from easyaudit.utils import serialize_instance
+from tests.test_app.models import (
+    ChildModel,
+    FieldTypesModel,
+    Model,
+    ProxyModel,
+    Tag,
+    UUIDM2MModel,
+    UUIDModel,
+)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "values",
+    [
+        {},
+        {
+            "char": 'héllo "quoted"',
+            "text": "line\nbreak",
+            "integer": -3,
+            "floating": 1.5,
+            "decimal": Decimal("12.345"),
+            "boolean": False,
+            "date": dt.date(2024, 2, 29),
+            "datetime": timezone.now(),
+            "time": dt.time(12, 30, 15, 123456),
+            "duration": dt.timedelta(days=1, microseconds=5),
+            "uuid": uuid.uuid4(),
+            "json": {"a": [1, None, "b"]},
+            "binary": b"\x00\xff",
+            "ip": "::1",
+            "file": "files/report.pdf",
+        },
+    ],
+)
+def test_field_types(values):
+    obj = FieldTypesModel.objects.create(
+        test_fk=Model.objects.create() if values else None, **values
+    )
+    obj.tags.add(Tag.objects.create(name="a"), Tag.objects.create(name="b"))
+
+    assert serialize_instance(obj) == serializers.serialize("json", [obj])
+    obj.refresh_from_db()
+    assert serialize_instance(obj) == serializers.serialize("json", [obj])
+
+
+@pytest.mark.django_db
+def test_prefetched_many_to_many():
+    obj = FieldTypesModel.objects.create()
+    obj.tags.add(Tag.objects.create(name="a"))
+    obj = FieldTypesModel.objects.prefetch_related("tags").get(pk=obj.pk)
+
+    assert serialize_instance(obj) == serializers.serialize("json", [obj])
+
+
+@pytest.mark.django_db
+def test_uuid_primary_keys():
+    obj = UUIDM2MModel.objects.create(name="m2m")
+    obj.test_m2m.add(UUIDModel.objects.create())
+
+    assert serialize_instance(obj) == serializers.serialize("json", [obj])
+
+
+@pytest.mark.django_db
+def test_inheritance():
+    proxy = ProxyModel.objects.create(name="proxy")
+    child = ChildModel.objects.create(name="child", extra="extra")
+
+    assert serialize_instance(proxy) == serializers.serialize("json", [proxy])
+    assert serialize_instance(child) == serializers.serialize("json", [child])
+
+
+def test_unsaved_instance():
+    obj = Model(name="unsaved")
+
+    assert serialize_instance(obj) == serializers.serialize("json", [obj])
+    with pytest.raises(ValueError, match="many-to-many"):
+        serialize_instance(FieldTypesModel())
@@ -0,0 +1,108 @@
+from io import StringIO
+
+import pytest
+from django.contrib.contenttypes.models import ContentType
+from django.core import management
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from easyaudit.backends import ModelBackend, SnapshotStore
+from easyaudit.models import CRUDEvent, Snapshot
+
+OBJECT_JSON_REPR = '[{"model": "test_app.model", "pk": 1, "fields": {"name": "x"}}]'
+
+
+def crud_info(**kwargs):
+    return {
+        "content_type_id": ContentType.objects.get_for_model(CRUDEvent).id,
+        "datetime": timezone.now(),
+        "event_type": CRUDEvent.M2M_CHANGE,
+        "object_id": 1,
+        "object_json_repr": OBJECT_JSON_REPR,
+        "object_repr": "event",
+        **kwargs,
+    }
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = SnapshotStore(cache_size=2)
+    monkeypatch.setattr("easyaudit.backends.DEDUPLICATE_SNAPSHOTS", True)
+    monkeypatch.setattr("easyaudit.backends.snapshot_store", store)
+    return store
+
+
+@pytest.mark.django_db
+def test_identical_snapshots_are_stored_once(store, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        ModelBackend().bulk_crud([crud_info(), crud_info(), crud_info(object_json_repr="")])
+
+    snapshot = Snapshot.objects.get()
+    assert snapshot.data == OBJECT_JSON_REPR
+    events = CRUDEvent.objects.order_by("pk")
+    assert [event.object_json_repr_hash for event in events] == [snapshot.hash] * 2 + [""]
+    assert [event.get_object_json_repr() for event in events] == [OBJECT_JSON_REPR] * 2 + [
+        ""
+    ]
+
+
+@pytest.mark.django_db
+def test_known_snapshots_are_not_inserted(store, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        ModelBackend().crud(crud_info())
+
+    with CaptureQueriesContext(connection) as queries:
+        ModelBackend().crud(crud_info())
+    assert len(queries) == 1
+
+    # Evicted from the cache: inserted again, and ignored by the database.
+    with django_capture_on_commit_callbacks(execute=True):
+        ModelBackend().crud(crud_info(object_json_repr="[1]"))
+        ModelBackend().crud(crud_info(object_json_repr="[2]"))
+        ModelBackend().crud(crud_info())
+    assert Snapshot.objects.count() == 3
+
+
+@pytest.mark.django_db(transaction=True)
+def test_rolled_back_snapshots_are_not_remembered(store):
+    def log_and_fail():
+        ModelBackend().crud(crud_info())
+        raise RuntimeError
+
+    with pytest.raises(RuntimeError):
+        transaction.atomic(log_and_fail)()
+    ModelBackend().crud(crud_info())
+
+    assert list(store._hashes) == [Snapshot.objects.get().hash]
+
+
+@pytest.mark.django_db
+def test_orphan_snapshots_are_deleted(store, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        ModelBackend().bulk_crud([crud_info(), crud_info(object_json_repr="[1]")])
+    CRUDEvent.objects.filter(
+        object_json_repr_hash=Snapshot.objects.get(data="[1]").hash
+    ).delete()
+
+    out = StringIO()
+    management.call_command("easyaudit_purge_snapshots", stdout=out)
+
+    assert out.getvalue() == "Deleted 1 snapshots.\n"
+    assert list(Snapshot.objects.values_list("data", flat=True)) == [OBJECT_JSON_REPR]
+    # The deleted snapshot must be inserted again if it is referred to again.
+    assert not store._hashes
+
+
+@pytest.mark.django_db
+def test_admin_purge_deletes_snapshots(store, admin_client):
+    ModelBackend().crud(crud_info())
+
+    response = admin_client.post(
+        reverse("admin:easyaudit_crudevent_purge"), {"btn-confirm": ""}
+    )
+
+    assert response.status_code == 302
+    assert not CRUDEvent.objects.exists()
+    assert not Snapshot.objects.exists()
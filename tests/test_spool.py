@@ -0,0 +1,109 @@
+import os
+import shutil
+
+import pytest
+from django.core import management
+from django.utils import timezone
+
+from easyaudit.backends import SpoolBackend
+from easyaudit.models import CRUDEvent, IngestedSegment, LoginEvent, RequestEvent
+from easyaudit.spool import sealed_segments
+
+
+@pytest.fixture
+def backend(tmp_path):
+    backend = SpoolBackend(spool_dir=tmp_path, segment_size=1024 * 1024, segment_age=3600)
+    yield backend
+    backend.close()
+
+
+def log_events(backend, count=3):
+    for i in range(count):
+        backend.request(
+            {
+                "url": f"/{i}",
+                "method": "GET",
+                "query_string": "",
+                "user_id": None,
+                "remote_ip": "127.0.0.1",
+                "datetime": timezone.now(),
+            }
+        )
+    backend.login({"login_type": LoginEvent.LOGIN, "username": "joe"})
+
+
+def ingest(spool_dir, **kwargs):
+    management.call_command("easyaudit_ingest", spool_dir=spool_dir, **kwargs)
+
+
+def test_segments_are_sealed_on_size(tmp_path):
+    backend = SpoolBackend(spool_dir=tmp_path, segment_size=1, segment_age=3600)
+    log_events(backend, count=2)
+
+    assert len(sealed_segments(tmp_path)) == 3
+    assert not list(tmp_path.glob("*.open"))
+
+
+def test_open_segments_are_not_ingested(backend, tmp_path):
+    log_events(backend)
+
+    assert sealed_segments(tmp_path) == []
+
+
+@pytest.mark.django_db
+def test_ingest(backend, tmp_path):
+    log_events(backend)
+    backend.writer.seal()
+    ingest(tmp_path)
+
+    assert RequestEvent.objects.count() == 3
+    assert LoginEvent.objects.count() == 1
+    assert IngestedSegment.objects.get().events == 4
+    assert not list(tmp_path.iterdir())
+
+
+@pytest.mark.django_db
+def test_ingest_is_idempotent(backend, tmp_path):
+    log_events(backend)
+    backend.writer.seal()
+    [segment] = sealed_segments(tmp_path)
+    # As if a crash happened after the rows were committed but before the
+    # segment was deleted.
+    shutil.copy(segment, tmp_path / "copy")
+    ingest(tmp_path)
+    shutil.move(tmp_path / "copy", segment)
+    ingest(tmp_path)
+
+    assert RequestEvent.objects.count() == 3
+    assert not list(tmp_path.iterdir())
+
+
+@pytest.mark.django_db
+def test_incomplete_line_is_skipped(backend, tmp_path):
+    log_events(backend)
+    backend.writer.seal()
+    [segment] = sealed_segments(tmp_path)
+    with open(segment, "a") as f:
+        f.write('["crud", {"event_type": ')
+    ingest(tmp_path)
+
+    assert RequestEvent.objects.count() == 3
+    assert CRUDEvent.objects.count() == 0
+
+
+@pytest.mark.skipif(os.name != "posix", reason="POSIX only")
+@pytest.mark.django_db
+def test_seal_orphans(backend, tmp_path):
+    log_events(backend)
+    backend.writer.seal()
+    [segment] = sealed_segments(tmp_path)
+    # Pretend the segment was left open by a process which no longer runs.
+    name = segment.name.split("-")
+    name[2] = "999999999"
+    segment.rename(tmp_path / f"{'-'.join(name)}.open")
+
+    ingest(tmp_path)
+    assert RequestEvent.objects.count() == 0
+
+    ingest(tmp_path, seal_orphans=True)
+    assert RequestEvent.objects.count() == 3
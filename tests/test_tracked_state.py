@@ -0,0 +1,123 @@
+import json
+
+import pytest
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from easyaudit.models import CRUDEvent
+from tests.test_app.models import ForeignKeyModel, Model
+
+pytestmark = pytest.mark.usefixtures("track_loaded_state")
+
+
+def save(obj, **kwargs):
+    """Save `obj`, and tell whether its row was selected first."""
+    with CaptureQueriesContext(connection) as queries:
+        obj.save(**kwargs)
+    table = Model._meta.db_table
+    return any(
+        query["sql"].startswith("SELECT") and table in query["sql"] for query in queries
+    )
+
+
+def last_changed_fields(obj):
+    event = CRUDEvent.objects.filter(
+        content_type=ContentType.objects.get_for_model(obj), object_id=obj.pk
+    ).latest("datetime", "pk")
+    return json.loads(event.changed_fields)
+
+
+@pytest.mark.django_db
+class TestTrackedState:
+    def test_loaded_instance(self):
+        obj = Model.objects.get(pk=Model.objects.create(name="a").pk)
+        obj.name = "b"
+
+        assert not save(obj)
+        assert last_changed_fields(obj) == {"name": ["a", "b"]}
+
+    def test_state_is_recorded_on_save(self):
+        obj = Model.objects.create(name="a")
+        obj.name = "b"
+        assert not save(obj)
+        obj.name = "c"
+        assert not save(obj)
+
+        assert last_changed_fields(obj) == {"name": ["b", "c"]}
+
+    def test_update_fields(self):
+        first, second = Model.objects.create(), Model.objects.create()
+        obj = ForeignKeyModel.objects.create(name="a", test_fk=first)
+        obj.name = "b"
+        obj.test_fk = second
+        obj.save(update_fields=["test_fk"])
+        obj.save()
+
+        # The name was not saved along with the foreign key.
+        assert last_changed_fields(obj) == {"name": ["a", "b"]}
+
+    def test_untracked_instance_falls_back_to_select(self):
+        obj = Model.objects.create(name="a")
+        del obj._easyaudit_loaded_state
+        obj.name = "b"
+
+        assert save(obj)
+        assert last_changed_fields(obj) == {"name": ["a", "b"]}
+
+    def test_deferred_fields_fall_back_to_select(self):
+        obj = Model.objects.only("id").get(pk=Model.objects.create(name="a").pk)
+        obj.name = "b"
+
+        assert save(obj)
+        assert last_changed_fields(obj) == {"name": ["a", "b"]}
+
+    def test_refreshed_instance(self):
+        obj = Model.objects.create(name="a")
+        Model.objects.filter(pk=obj.pk).update(name="b")
+        obj.refresh_from_db()
+        obj.name = "c"
+
+        assert not save(obj)
+        assert last_changed_fields(obj) == {"name": ["b", "c"]}
+
+    def test_refreshed_fields(self):
+        first, second = Model.objects.create(), Model.objects.create()
+        obj = ForeignKeyModel.objects.create(name="a", test_fk=first)
+        ForeignKeyModel.objects.filter(pk=obj.pk).update(name="b")
+        obj.test_fk = second
+        obj.refresh_from_db(fields=["name"])
+        obj.name = "c"
+        obj.save()
+
+        # The foreign key was not refreshed, and keeps its recorded value.
+        assert last_changed_fields(obj) == {
+            "name": ["b", "c"],
+            "test_fk": [str(first.pk), str(second.pk)],
+        }
+
+    def test_rolled_back_save_falls_back_to_select(self):
+        obj = Model.objects.create(name="a")
+
+        def save_and_fail():
+            with transaction.atomic():
+                obj.name = "b"
+                obj.save()
+                raise RuntimeError
+
+        with pytest.raises(RuntimeError):
+            save_and_fail()
+        obj.name = "c"
+
+        assert save(obj)
+        assert last_changed_fields(obj) == {"name": ["a", "c"]}
+
+    def test_committed_save(self):
+        obj = Model.objects.create(name="a")
+        with transaction.atomic():
+            obj.name = "b"
+            obj.save()
+        obj.name = "c"
+
+        assert not save(obj)
+        assert last_changed_fields(obj) == {"name": ["b", "c"]}
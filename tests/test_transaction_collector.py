@@ -0,0 +1,112 @@
+"""CRUD events of a transaction are written together when it commits."""
+
+import pytest
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from easyaudit.models import CRUDEvent
+from tests.test_app.models import Model, Tag
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+@pytest.fixture(autouse=True)
+def _on_commit(settings):
+    settings.TEST = False
+
+
+def crud_event_inserts(ctx):
+    table = CRUDEvent._meta.db_table
+    return [
+        q for q in ctx.captured_queries if q["sql"].startswith(f'INSERT INTO "{table}"')
+    ]
+
+
+def test_events_are_written_in_one_insert():
+    with CaptureQueriesContext(connection) as ctx, transaction.atomic():
+        objs = [Model.objects.create(name=f"obj {i}") for i in range(5)]
+        objs[0].name = "renamed"
+        objs[0].save()
+        objs[1].delete()
+
+        assert CRUDEvent.objects.count() == 0
+
+    assert len(crud_event_inserts(ctx)) == 1
+    assert CRUDEvent.objects.filter(event_type=CRUDEvent.CREATE).count() == 5
+    assert CRUDEvent.objects.filter(event_type=CRUDEvent.UPDATE).count() == 1
+    assert CRUDEvent.objects.filter(event_type=CRUDEvent.DELETE).count() == 1
+
+
+def create_and_fail(**kwargs):
+    with transaction.atomic():
+        Model.objects.create(**kwargs)
+        raise RuntimeError
+
+
+def test_rollback_discards_events():
+    with pytest.raises(RuntimeError):
+        create_and_fail()
+
+    Model.objects.create()
+
+    assert CRUDEvent.objects.count() == 1
+
+
+def test_savepoint_rollback_discards_its_events():
+    with transaction.atomic():
+        kept = Model.objects.create(name="kept")
+        with pytest.raises(RuntimeError):
+            create_and_fail(name="rolled back")
+        also_kept = Model.objects.create(name="also kept")
+
+    assert sorted(CRUDEvent.objects.values_list("object_id", flat=True)) == sorted(
+        [str(kept.pk), str(also_kept.pk)]
+    )
+
+
+def test_savepoint_rolled_back_last_discards_its_events():
+    with transaction.atomic():
+        kept = Model.objects.create(name="kept")
+        with pytest.raises(RuntimeError):
+            create_and_fail(name="rolled back")
+
+    assert CRUDEvent.objects.get().object_id == str(kept.pk)
+
+
+def test_events_are_written_in_order_across_savepoints():
+    with transaction.atomic():
+        Model.objects.create()
+        # `get_or_create()` creates the object within a savepoint.
+        tag, _ = Tag.objects.get_or_create(name="tag")
+        tag.name = "renamed"
+        tag.save()
+
+    events = CRUDEvent.objects.order_by("pk")
+    assert [(event.content_type.model, event.event_type) for event in events] == [
+        ("model", CRUDEvent.CREATE),
+        ("tag", CRUDEvent.CREATE),
+        ("tag", CRUDEvent.UPDATE),
+    ]
+    assert events[1].datetime <= events[2].datetime
+
+
+def test_updates_are_written_in_order_across_savepoints():
+    with transaction.atomic():
+        obj = Model.objects.create(name="a")
+        with transaction.atomic():
+            obj.name = "b"
+            obj.save()
+        obj.name = "c"
+        obj.save()
+
+    events = CRUDEvent.objects.filter(event_type=CRUDEvent.UPDATE).order_by("pk")
+    assert [event.changed_fields for event in events] == [
+        '{"name": ["a", "b"]}',
+        '{"name": ["b", "c"]}',
+    ]
+
+
+def test_autocommit_writes_immediately():
+    obj = Model.objects.create()
+
+    assert CRUDEvent.objects.get().object_id == str(obj.pk)